@@ -0,0 +1,237 @@
+"""
+Asyncio fetch backend for the Weather App
+
+One event loop runs in a dedicated daemon thread for the whole process.
+Script threads hand it coroutines through event_loop.run() and block only
+on their own result, so hundreds of upstream requests can be in flight at
+once without one OS thread (and pool worker) per waiting call.
+
+AsyncHTTPClient sends requests through httpx's AsyncClient (keep-alive
+pool, redirects, HTTP(S)_PROXY / NO_PROXY from the environment like
+requests) and keeps the behaviour of http_client.HTTPClient: timeouts,
+bounded retries with jittered backoff on 429/5xx, a circuit breaker per
+host and latency stats.
+Responses expose the parts of requests.Response the app uses, and errors
+are raised as requests exceptions, so callers handle both backends alike.
+
+FETCH_BACKEND=threads switches the app back to the blocking requests path.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+
+from http_client import (
+    http_client, backoff_delay, CircuitBreaker, CircuitOpenError, LatencyStats,
+    CONNECT_TIMEOUT, READ_TIMEOUT, MAX_RETRIES, RETRY_STATUS_CODES
+)
+
+# Backend configuration (overridable through environment variables)
+FETCH_BACKEND = os.getenv("FETCH_BACKEND", "async")  # "async" (event loop thread) or "threads" (blocking requests)
+ASYNC_CONNECTIONS_PER_HOST = int(os.getenv("ASYNC_CONNECTIONS_PER_HOST", "100"))  # open at once, per upstream host
+ASYNC_IDLE_TIMEOUT = float(os.getenv("ASYNC_IDLE_TIMEOUT", "30"))  # seconds an idle connection is reused
+
+USER_AGENT = "weather-app/1.0"
+
+
+class LoopThread:
+    """An asyncio event loop running forever on its own daemon thread
+
+    Blocking steps (SQLite, parsing) are handed to the loop's default
+    executor with asyncio.to_thread(); its threads are named "<name>-io".
+    """
+
+    def __init__(self, name="fetch-loop"):
+        self.name = name
+        self.submitted = 0
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self):
+        """The running loop, started on first use"""
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    loop.set_default_executor(ThreadPoolExecutor(thread_name_prefix=f"{self.name}-io"))
+                    self._thread = threading.Thread(target=loop.run_forever, name=self.name, daemon=True)
+                    self._thread.start()
+                    self._loop = loop
+        return self._loop
+
+    def submit(self, coro):
+        """Schedule coro on the loop; returns a concurrent.futures.Future"""
+        self.submitted += 1
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Run coro on the loop and block the calling thread until it finishes"""
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("event_loop.run() called from the loop thread; await the coroutine instead")
+        return self.submit(coro).result(timeout)
+
+    def stats(self):
+        loop = self._loop
+        in_flight = 0
+        if loop is not None:
+            try:
+                in_flight = len(asyncio.all_tasks(loop))
+            except RuntimeError:
+                pass  # Task set changed while counting; report 0 this time
+        return {
+            'running': loop is not None,
+            'submitted': self.submitted,
+            'in_flight': in_flight
+        }
+
+
+class AsyncResponse:
+    """The subset of requests.Response the fetchers rely on"""
+
+    def __init__(self, url, status_code, reason, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise requests.HTTPError(f"{self.status_code} {kind} Error: {self.reason} for url: {self.url}", response=self)
+
+
+class AsyncHTTPClient:
+    """HTTP client on asyncio (httpx) with retries and per-host circuit breakers"""
+
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, max_retries=MAX_RETRIES,
+                 connections_per_host=ASYNC_CONNECTIONS_PER_HOST):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.connections_per_host = connections_per_host
+        self._client = None  # httpx.AsyncClient, created on the loop it is used from
+        self._slots = {}  # host -> asyncio.Semaphore; only touched on the loop thread
+        self._breakers = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    async def get(self, url, params=None, timeout=None):
+        """Send a GET request and return the final AsyncResponse
+
+        Raises requests.RequestException (including CircuitOpenError) when the
+        host is unreachable; HTTP error statuses are left to raise_for_status().
+        """
+        host = urlsplit(url).netloc
+        breaker, stats = self._for_host(host)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{host} is temporarily unavailable (circuit open)")
+        try:
+            return await self._attempts(url, params, timeout, breaker, stats)
+        finally:
+            breaker.release()  # A cancelled or otherwise failed trial must not leave the host half-open for good
+
+    async def _attempts(self, url, params, timeout, breaker, stats):
+        """The request with its retries; records the outcome on breaker and stats"""
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = await self._send(url, params, timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                stats.record(time.perf_counter() - started, ok=False)
+                if attempt >= self.max_retries:
+                    breaker.record_failure()
+                    raise
+                stats.retries += 1
+                await asyncio.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            ok = response.status_code not in RETRY_STATUS_CODES
+            stats.record(time.perf_counter() - started, ok=ok)
+            if ok:
+                breaker.record_success()
+                return response
+            if attempt >= self.max_retries:
+                breaker.record_failure()
+                return response
+
+            stats.retries += 1
+            await asyncio.sleep(backoff_delay(attempt, response))
+            attempt += 1
+
+    def metrics(self):
+        """Return latency and breaker state for every host seen so far"""
+        with self._lock:
+            hosts = list(self._stats)
+        return {host: dict(self._stats[host].snapshot(), circuit=self._breakers[host].state) for host in hosts}
+
+    def _for_host(self, host):
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker()
+                self._stats[host] = LatencyStats()
+            return self._breakers[host], self._stats[host]
+
+    def _session(self):
+        """The shared httpx client (keep-alive pool; proxies from the environment, like requests)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={'User-Agent': USER_AGENT, 'Accept': 'application/json'},
+                limits=httpx.Limits(max_connections=None, keepalive_expiry=ASYNC_IDLE_TIMEOUT),
+                follow_redirects=True,
+                trust_env=True
+            )
+        return self._client
+
+    async def _send(self, url, params, timeout):
+        """One request (following redirects), with httpx errors mapped to requests ones"""
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (
+            timeout or self.connect_timeout, timeout or self.read_timeout
+        )
+        host = urlsplit(url).netloc
+        slots = self._slots.get(host)
+        if slots is None:
+            slots = self._slots[host] = asyncio.Semaphore(self.connections_per_host)
+
+        async with slots:
+            try:
+                response = await self._session().get(
+                    url, params=params, timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+                )
+            except httpx.ConnectTimeout:
+                raise requests.ConnectTimeout(f"connect to {host} timed out after {connect_timeout}s") from None
+            except httpx.TimeoutException:
+                raise requests.ReadTimeout(f"read timed out after {read_timeout}s: {url}") from None
+            except httpx.TransportError as e:
+                raise requests.ConnectionError(f"connection to {host} failed: {e}") from None
+            except httpx.TooManyRedirects as e:
+                raise requests.TooManyRedirects(str(e)) from None
+        return AsyncResponse(
+            str(response.url), response.status_code, response.reason_phrase, response.headers, response.content
+        )
+
+
+def blocking_get(url, params=None, timeout=None):
+    """GET from a plain thread through the configured backend"""
+    if FETCH_BACKEND == 'async':
+        return event_loop.run(async_http.get(url, params=params, timeout=timeout))
+    return http_client.get(url, params=params, timeout=timeout)
+
+
+event_loop = LoopThread()
+async_http = AsyncHTTPClient()
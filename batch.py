@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Headless batch mode for the Weather App
+
+Fetches current weather and the 5-day forecast for every city in a list and
+streams one row per city and forecast day to CSV, JSONL or Parquet:
+
+    python batch.py cities.csv -o results.csv --concurrency 8
+
+Cities are read lazily (CSV with a `city` column, JSONL with a "city" key
+or bare strings, or plain text with one city per line) and only a bounded
+window of them is in flight at once, so memory stays flat however long the
+list is. Cities are appended to a checkpoint file once their rows are
+safely in the output; re-running the same command skips them, so an
+interrupted run picks up where it stopped.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# Batch runs are one-off sweeps: don't keep a background refresher busy
+os.environ.setdefault("HOT_CITIES_COUNT", "0")
+
+from forecast import normalize_forecast, daily_summary
+from rate_limiter import RateLimitExceeded
+from weather_api import get_weather_data, get_forecast_data
+from weather_cache import normalize_city
+
+PROGRESS_INTERVAL = 5  # seconds between progress lines
+RATE_LIMIT_RETRIES = 30  # waits for API budget before a city is given up
+
+OUTPUT_FIELDS = [
+    'city', 'city_id', 'country', 'lat', 'lon', 'observed_at',
+    'current_temp', 'current_feels_like', 'current_humidity', 'current_pressure',
+    'current_wind_speed', 'current_clouds', 'current_weather',
+    'date', 'min_temp', 'max_temp', 'avg_temp', 'avg_humidity', 'weather', 'icon'
+]
+
+
+def read_cities(path):
+    """Yield city names from a CSV, JSONL or plain text file"""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8", newline="") as f:
+        if extension == ".csv":
+            reader = csv.DictReader(f)
+            # Without a `city` header the first column holds the names
+            column = 'city' if 'city' in (reader.fieldnames or []) else (reader.fieldnames or [None])[0]
+            for row in reader:
+                city = row.get(column)
+                if city and city.strip():
+                    yield city.strip()
+        elif extension in (".jsonl", ".ndjson"):
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    entry = None
+                city = entry.get('city') if isinstance(entry, dict) else entry
+                if isinstance(city, str) and city.strip():
+                    yield city.strip()
+                else:
+                    print(f"⚠️  {path}:{number}: no city name, line skipped", file=sys.stderr)
+        else:
+            for line in f:
+                if line.strip():
+                    yield line.strip()
+
+
+def fetch_city_rows(city, api_key):
+    """Fetch one city and flatten it to one output row per forecast day"""
+    for attempt in range(RATE_LIMIT_RETRIES):
+        try:
+            weather = get_weather_data(city, api_key)
+            forecast = get_forecast_data(city, api_key)
+            break
+        except RateLimitExceeded:
+            time.sleep(min(2 ** attempt, 10))  # Wait for the bucket to refill
+    else:
+        raise RateLimitExceeded(f"gave up on {city} waiting for API budget")
+
+    current = {
+        'city': city,
+        'city_id': weather.city_id,
+        'country': weather.country,
+        'lat': weather.lat,
+        'lon': weather.lon,
+        'observed_at': weather.observed_at,
+        'current_temp': weather.temp,
+        'current_feels_like': weather.feels_like,
+        'current_humidity': weather.humidity,
+        'current_pressure': weather.pressure,
+        'current_wind_speed': weather.wind_speed,
+        'current_clouds': weather.clouds,
+        'current_weather': weather.description
+    }
+
+    df = normalize_forecast(forecast, weather.timezone)
+    if df.empty:
+        return [dict(current)]
+
+    rows = []
+    for day in daily_summary(df).to_dict('records'):
+        row = dict(current)
+        row.update({
+            'date': day['Date'],
+            'min_temp': day['Min Temp'],
+            'max_temp': day['Max Temp'],
+            'avg_temp': day['Avg Temp'],
+            'avg_humidity': day['Avg Humidity'],
+            'weather': day['Weather'],
+            'icon': day['Icon']
+        })
+        rows.append(row)
+    return rows
+
+
+# Sinks take each city's rows with write(rows, city) and return the cities
+# whose rows are durably in the output (only those are checkpointed);
+# close() returns the rest.
+
+class CSVSink:
+    def __init__(self, path):
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "a", encoding="utf-8", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=OUTPUT_FIELDS)
+        if is_new:
+            self.writer.writeheader()
+
+    def write(self, rows, city):
+        self.writer.writerows(rows)
+        self.file.flush()
+        return [city]
+
+    def close(self):
+        self.file.close()
+        return []
+
+
+class JSONLSink:
+    def __init__(self, path):
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, rows, city):
+        for row in rows:
+            self.file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.file.flush()
+        return [city]
+
+    def close(self):
+        self.file.close()
+        return []
+
+
+class ParquetSink:
+    """Writes a directory of Parquet part files, one complete file per flush
+
+    A Parquet file is unreadable until its footer is written, so each flush
+    writes and closes its own part file (under a temporary name, renamed
+    when complete). A run that dies loses only the rows still buffered, and
+    those cities are not in the checkpoint yet.
+    """
+
+    FLUSH_ROWS = 5000
+    INT_FIELDS = ('city_id', 'observed_at', 'current_humidity', 'current_pressure', 'current_clouds')
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            sys.exit("❌ Parquet output needs pyarrow: pip install pyarrow")
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.part = len([name for name in os.listdir(path) if name.endswith(".parquet")])
+        self.schema = pa.schema([
+            (name, pa.string() if name in ('city', 'country', 'current_weather', 'date', 'weather', 'icon')
+             else pa.int64() if name in self.INT_FIELDS
+             else pa.float64())
+            for name in OUTPUT_FIELDS
+        ])
+        self.buffer = []
+        self.pending = []  # cities whose rows are in the buffer
+
+    def write(self, rows, city):
+        for row in rows:
+            # OpenWeatherMap may send 65.0 for a percentage; keep the integer columns integer
+            for name in self.INT_FIELDS:
+                if isinstance(row.get(name), float):
+                    row[name] = int(round(row[name]))
+        self.buffer.extend(rows)
+        self.pending.append(city)
+        if len(self.buffer) >= self.FLUSH_ROWS:
+            return self.flush()
+        return []
+
+    def flush(self):
+        """Write the buffer as one new part file; returns the cities it held"""
+        if not self.buffer:
+            return []
+        target = os.path.join(self.path, f"part-{self.part:05d}.parquet")
+        while os.path.exists(target):
+            self.part += 1
+            target = os.path.join(self.path, f"part-{self.part:05d}.parquet")
+        self.pq.write_table(self.pa.Table.from_pylist(self.buffer, schema=self.schema), target + ".tmp")
+        os.replace(target + ".tmp", target)
+        self.part += 1
+        flushed, self.buffer, self.pending = self.pending, [], []
+        return flushed
+
+    def close(self):
+        return self.flush()
+
+
+SINKS = {
+    'csv': CSVSink,
+    'jsonl': JSONLSink,
+    'parquet': ParquetSink
+}
+
+
+def load_checkpoint(path):
+    """Return the set of (normalized) cities already written by earlier runs"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def run(args):
+    api_key = args.api_key or os.getenv("OPENWEATHER_API_KEY")
+    if not api_key or api_key == "your_api_key_here":
+        sys.exit("⚠️ Please set OPENWEATHER_API_KEY (or pass --api-key)")
+
+    output_format = args.format or os.path.splitext(args.output)[1].lstrip(".").lower()
+    if output_format not in SINKS:
+        sys.exit(f"❌ Unknown output format '{output_format}' (use one of: {', '.join(SINKS)})")
+
+    checkpoint_path = args.checkpoint or args.output.rstrip("/") + ".checkpoint"
+    done = load_checkpoint(checkpoint_path)
+    if done:
+        print(f"↩️  Resuming: {len(done)} cities already done")
+
+    sink = SINKS[output_format](args.output)
+    checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+    write_lock = threading.Lock()
+    counts = {'ok': 0, 'failed': 0, 'skipped': 0}
+    started = last_report = time.monotonic()
+
+    def save_progress(cities):
+        """Checkpoint cities whose rows the sink has made durable (caller holds write_lock)"""
+        if cities:
+            checkpoint.write("".join(normalize_city(city) + "\n" for city in cities))
+            checkpoint.flush()
+
+    def process(city):
+        rows = fetch_city_rows(city, api_key)
+        with write_lock:
+            save_progress(sink.write(rows, city))
+
+    max_in_flight = args.concurrency * 2
+    in_flight = {}
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="batch") as executor:
+            cities = read_cities(args.input)
+            exhausted = False
+            while in_flight or not exhausted:
+                # Keep the window full without reading the whole list into memory
+                while not exhausted and len(in_flight) < max_in_flight:
+                    city = next(cities, None)
+                    if city is None:
+                        exhausted = True
+                    elif normalize_city(city) in done:
+                        counts['skipped'] += 1
+                    else:
+                        done.add(normalize_city(city))  # Also de-duplicates the input
+                        in_flight[executor.submit(process, city)] = city
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    city = in_flight.pop(future)
+                    try:
+                        future.result()
+                        counts['ok'] += 1
+                    except Exception as e:
+                        counts['failed'] += 1
+                        print(f"⚠️  {city}: {e}", file=sys.stderr)
+
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    rate = counts['ok'] / (now - started)
+                    print(f"⏳ {counts['ok']} done, {counts['failed']} failed, {rate:.1f} cities/s")
+    finally:
+        try:
+            with write_lock:
+                save_progress(sink.close())
+        finally:
+            checkpoint.close()
+
+    elapsed = time.monotonic() - started
+    rate = counts['ok'] / elapsed if elapsed else 0.0
+    print(f"✅ {counts['ok']} cities written to {args.output} in {elapsed:.1f}s ({rate:.1f} cities/s), "
+          f"{counts['failed']} failed, {counts['skipped']} skipped from checkpoint")
+    return 1 if counts['failed'] else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch and export weather for a list of cities")
+    parser.add_argument("input", help="city list (.csv with a 'city' column, .jsonl, or one city per line)")
+    parser.add_argument("-o", "--output", required=True, help="output file (.csv, .jsonl) or Parquet directory (.parquet)")
+    parser.add_argument("--format", choices=sorted(SINKS), help="output format (default: from the output extension)")
+    parser.add_argument("--concurrency", type=int, default=8, help="cities fetched at once (default: 8)")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--api-key", help="OpenWeatherMap API key (default: OPENWEATHER_API_KEY)")
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Sessions-per-process benchmark: async fetch backend vs blocking thread pool
+
+Starts the mock API with a fixed latency and, for each backend and each
+session count, lets that many simulated sessions (one script thread each,
+as Streamlit runs them) fetch a city that is not cached yet, all at once:
+
+    python benchmarks/bench_backends.py --latency 0.2 --sessions 16 64 256 512
+
+The mock runs in a separate process. Per run it reports the wall time,
+pages/s, p50/p95 page latency, pages that missed the fetch deadline and the
+number of OS threads the fetch layer itself was running (pool workers or
+the event loop). Prints one JSON document.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from run_benchmarks import API_KEY, configure_environment, summarize
+
+BACKENDS = ("threads", "async")
+FETCH_THREADS = {"threads": "weather-fetch", "async": "fetch-loop"}  # thread name prefix per backend
+
+
+def start_mock(latency):
+    """Run the mock API in its own process so its threads and GIL stay out of the numbers"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BENCHMARKS_DIR, "mock_server.py"), "--port", str(port), "--latency", str(latency)],
+        stdout=subprocess.DEVNULL
+    )
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("mock server did not start")
+
+
+def use_backend(backend):
+    import async_client
+    import weather_api
+    async_client.FETCH_BACKEND = weather_api.FETCH_BACKEND = backend
+
+
+def run_sessions(backend, sessions, round_index):
+    """All sessions fetch one uncached city each; returns the run's figures"""
+    from weather_api import fetch_city
+    use_backend(backend)
+    barrier = threading.Barrier(sessions + 1)
+    samples, failures = [], [0]
+    lock = threading.Lock()
+
+    def session(index):
+        city = f"{backend} {round_index} City {index}"
+        barrier.wait()
+        started = time.perf_counter()
+        results, errors = fetch_city(city, API_KEY)
+        with lock:
+            samples.append(time.perf_counter() - started)
+            failures[0] += bool(errors)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    peak = [0]
+    done = threading.Event()
+
+    def sample_threads():
+        while not done.is_set():
+            peak[0] = max(peak[0], sum(t.name.startswith(FETCH_THREADS[backend]) for t in threading.enumerate()))
+            time.sleep(0.005)
+
+    sampler = threading.Thread(target=sample_threads, daemon=True)
+    sampler.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    sampler.join()
+
+    return dict(
+        summarize(samples), failures=failures[0], elapsed_s=round(elapsed, 3),
+        pages_per_s=round(sessions / elapsed, 1), fetch_threads=peak[0]
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare fetch backends under many concurrent sessions")
+    parser.add_argument("--latency", type=float, default=0.2, help="mock API latency in seconds (default: 0.2)")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[16, 64, 256, 512], help="concurrent sessions per run")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    args = parser.parse_args(argv)
+
+    server, url = start_mock(args.latency)
+    configure_environment(url, tempfile.mkdtemp(prefix="weather-bench-"))
+    os.environ['OBSERVATION_STORE_ENABLED'] = '0'  # keep disk writes out of the measurement
+    os.environ['DISK_CACHE_ENABLED'] = '0'
+
+    results = {backend: {} for backend in args.backends}
+    for round_index, sessions in enumerate(args.sessions):
+        for backend in args.backends:
+            results[backend][sessions] = run_sessions(backend, sessions, round_index)
+            print(f"⏱️ {backend:7} {sessions:4} sessions: {results[backend][sessions]['pages_per_s']} pages/s, "
+                  f"p95 {results[backend][sessions]['p95_ms']:.0f} ms, "
+                  f"{results[backend][sessions]['failures']} failed", file=sys.stderr)
+    server.terminate()
+
+    print(json.dumps({'config': vars(args), 'results': results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
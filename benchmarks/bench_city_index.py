@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Startup and lookup benchmark for the offline city index
+
+    python benchmarks/bench_city_index.py                    # bundled data/cities.tsv
+    python benchmarks/bench_city_index.py --synthetic 200000 # GeoNames-sized index
+
+Prints one JSON document with import and first-lookup times, resident memory
+added by loading the index, and p50/p95 latencies (milliseconds) for prefix
+suggestions and typo checks.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() // 1024
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {
+        'p50_ms': round(statistics.median(samples) * 1000, 4),
+        'p95_ms': round(samples[int(len(samples) * 0.95) - 1] * 1000, 4)
+    }
+
+
+def synthetic_cities(count):
+    rng = random.Random(1)
+    for _ in range(count):
+        name = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12))).title()
+        yield name, rng.choice(['US', 'GB', 'DE', 'FR', 'IN', 'CN', 'BR']), rng.randint(1000, 5000000)
+
+
+def typo(name, rng):
+    i = rng.randrange(1, len(name))
+    return name[:i] + name[i + 1:]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the city index")
+    parser.add_argument("--synthetic", type=int, default=0, help="build a synthetic index with this many cities")
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        from city_index import write_index
+        path = os.path.join(tempfile.mkdtemp(prefix="city-bench-"), "cities.tsv")
+        write_index(synthetic_cities(args.synthetic), path)
+        os.environ["CITY_INDEX_PATH"] = path
+        sys.modules.pop("city_index", None)
+
+    rss_before = rss_kb()
+    t = time.perf_counter()
+    import city_index
+    import_ms = (time.perf_counter() - t) * 1000
+
+    index = city_index.city_index
+    t = time.perf_counter()
+    index.check("London")
+    first_lookup_ms = (time.perf_counter() - t) * 1000
+    rss_added_kb = rss_kb() - rss_before
+
+    names = [entry[1] for entry in (line.split('\t') for line in open(index.path, encoding='utf-8'))]
+    rng = random.Random(3)
+
+    prefix = []
+    for _ in range(args.queries):
+        name = rng.choice(names)
+        t = time.perf_counter()
+        index.suggest(name[:rng.randint(2, 4)])
+        prefix.append(time.perf_counter() - t)
+
+    exact = []
+    for _ in range(args.queries):
+        name = rng.choice(names)
+        t = time.perf_counter()
+        index.check(name)
+        exact.append(time.perf_counter() - t)
+
+    fuzzy = []
+    for _ in range(args.queries):
+        name = typo(rng.choice(names), rng)
+        t = time.perf_counter()
+        index.check(name)
+        fuzzy.append(time.perf_counter() - t)
+
+    print(json.dumps({
+        'cities': len(names),
+        'index_bytes': os.path.getsize(index.path),
+        'import_ms': round(import_ms, 3),
+        'first_lookup_ms': round(first_lookup_ms, 3),
+        'rss_added_kb': rss_added_kb,
+        'prefix_suggest': percentiles(prefix),
+        'check_known': percentiles(exact),
+        'check_typo': percentiles(fuzzy)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
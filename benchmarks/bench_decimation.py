@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Chart payload benchmark for forecast decimation
+
+Builds the temperature and humidity figures from synthetic hourly series of
+growing length, once as shipped (decimated to the chart's point budget) and
+once with every point, and reports build + serialization time, the JSON
+size Streamlit sends to the browser and the number of points in it:
+
+    python benchmarks/bench_decimation.py --lengths 40 1000 10000 50000
+
+Prints one JSON document.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from charts import build_temperature_figure, build_humidity_figure
+from decimation import chart_points
+from forecast import normalize_forecast
+from records import Forecast
+
+ICONS = ['01d', '02d', '03d', '10d', '13d']
+
+
+def synthetic_forecast(slots, seed=0):
+    """A /forecast-shaped payload with `slots` hourly points (daily cycle plus noise)"""
+    rng = random.Random(seed)
+    start = int(time.time()) // 3600 * 3600
+    items = []
+    for i in range(slots):
+        temp = 12 + 8 * math.sin(i * 2 * math.pi / 24) + rng.gauss(0, 1.5)
+        items.append({
+            'dt': start + i * 3600,
+            'main': {'temp': round(temp, 2), 'humidity': rng.randint(30, 100)},
+            'weather': [{'description': 'clear sky', 'icon': rng.choice(ICONS)}]
+        })
+    return {'city': {'id': 1, 'name': 'Bench', 'timezone': 0}, 'list': items}
+
+
+def measure(df, max_points, repeats):
+    """Best build + to_json time, payload bytes and points for both figures"""
+    best, payload = float('inf'), 0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        figures = [build_temperature_figure(df, max_points), build_humidity_figure(df, max_points)]
+        payload = sum(len(figure.to_json()) for figure in figures)
+        best = min(best, time.perf_counter() - started)
+    points = sum(len(trace.x) for figure in figures for trace in figure.data)
+    return {'ms': round(best * 1000, 1), 'payload_kb': round(payload / 1024, 1), 'points': points}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Figure payload with and without decimation")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[40, 1000, 10000, 50000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    build_temperature_figure(normalize_forecast(synthetic_forecast(40)))  # Warm-up: loads Plotly's validators
+
+    results = {}
+    for length in args.lengths:
+        df = normalize_forecast(Forecast.from_json(synthetic_forecast(length)))
+        results[length] = {
+            'decimated': measure(df, None, args.repeats),
+            'full': measure(df, len(df), args.repeats)
+        }
+        print(f"⏱️ {length:6} points: {results[length]['decimated']['payload_kb']} KB decimated, "
+              f"{results[length]['full']['payload_kb']} KB full", file=sys.stderr)
+
+    print(json.dumps({'config': vars(args), 'point_budget': chart_points(), 'results': results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
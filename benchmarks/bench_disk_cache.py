@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Restart benchmark for the compressed disk cache tier
+
+Starts the mock API (in its own process) with a fixed latency, then runs
+three fresh app processes against one data directory:
+
+    populate  fetch --cities cities and wait for the disk writes
+    warm      a restarted process: time the first request of every city
+              (served from disk, then from memory)
+    cold      the same restart with DISK_CACHE_ENABLED=0 (every first
+              request goes upstream)
+
+    python benchmarks/bench_disk_cache.py --cities 200 --latency 0.2
+
+Prints one JSON document with first-request latencies, upstream calls per
+phase and the on-disk size and compression ratio.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from bench_backends import start_mock
+from run_benchmarks import API_KEY, configure_environment, summarize
+
+
+def city_names(count):
+    return [f"Disk City {i}" for i in range(count)]
+
+
+def run_phase(phase, cities):
+    """Body of one child process; returns its figures"""
+    from disk_cache import disk_cache
+    from weather_api import fetch_city, fetch_cities
+    from weather_cache import response_cache, async_response_flight
+
+    names = city_names(cities)
+    if phase == 'populate':
+        fetch_cities(names, API_KEY)
+        disk_cache.flush()
+        return {
+            'upstream_requests': async_response_flight.stats()['executions'],
+            'disk_cache': disk_cache.stats(),
+            'file_bytes': sum(os.path.getsize(disk_cache.path + suffix)
+                              for suffix in ('', '-wal') if os.path.exists(disk_cache.path + suffix))
+        }
+
+    samples = []
+    for city in names:
+        started = time.perf_counter()
+        results, errors = fetch_city(city, API_KEY)
+        samples.append(time.perf_counter() - started)
+        assert not errors, errors
+    return {
+        'first_request': summarize(samples),
+        'upstream_requests': async_response_flight.stats()['executions'],
+        'disk_cache': disk_cache.stats(),
+        'memory_entries': response_cache.stats()['entries']
+    }
+
+
+def spawn(phase, cities, env):
+    output = subprocess.run(
+        [sys.executable, __file__, "--phase", phase, "--cities", str(cities)],
+        env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm restart from the disk cache vs a cold restart")
+    parser.add_argument("--cities", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2, help="mock API latency in seconds (default: 0.2)")
+    parser.add_argument("--phase", choices=("populate", "warm", "cold"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.phase:
+        print(json.dumps(run_phase(args.phase, args.cities)))
+        return
+
+    server, url = start_mock(args.latency)
+    configure_environment(url, tempfile.mkdtemp(prefix="weather-bench-"))
+    os.environ['OBSERVATION_STORE_ENABLED'] = '0'  # keep disk writes out of the measurement
+    results = {}
+    try:
+        for phase in ("populate", "warm", "cold"):
+            env = dict(os.environ, DISK_CACHE_ENABLED='0' if phase == 'cold' else '1')
+            results[phase] = spawn(phase, args.cities, env)
+            print(f"⏱️ {phase}: {results[phase]['upstream_requests']} upstream requests", file=sys.stderr)
+    finally:
+        server.terminate()
+
+    print(json.dumps({'config': vars(args), 'results': results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Refresh-cycle benchmark for the forecast timeline store
+
+Simulates auto-refreshing many cities. Each cycle every city gets a new
+/forecast response; only --changed of them actually differ, in a few slots.
+Each refresh is handled two ways:
+
+    full         re-derive frame, daily summary, both charts and the map
+                 for every refreshed city (what a whole-payload refresh did)
+    incremental  merge into the ForecastStore; unchanged cities keep their
+                 outputs, changed ones rebuild the frame and charts, patch
+                 the daily summary and rebuild the map only if its
+                 markers changed
+
+    python benchmarks/bench_forecast_store.py --cities 50 --cycles 4 --changed 0.3
+
+Prints one JSON document with milliseconds per cycle and rebuild counts.
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from mock_server import load_fixtures
+from charts import build_temperature_figure, build_humidity_figure, build_weather_map, render_map_html, map_version
+from forecast import normalize_forecast, daily_summary, update_daily_summary
+from forecast_store import ForecastStore
+from records import CurrentWeather, Forecast
+
+
+def city_forecasts(fixtures, cities):
+    forecasts = []
+    for i in range(cities):
+        forecast = copy.deepcopy(fixtures['forecast'])
+        forecast['city']['id'] = 1000 + i
+        forecasts.append(forecast)
+    return forecasts
+
+
+def mutate(forecast, rng, slots):
+    """Change the temperature of a few random slots"""
+    for item in rng.sample(forecast['list'], slots):
+        item['main']['temp'] = round(item['main']['temp'] + rng.uniform(-2, 2), 2)
+
+
+def render_all(weather, forecast, timezone_offset):
+    df = normalize_forecast(forecast, timezone_offset)
+    build_temperature_figure(df), build_humidity_figure(df)
+    render_map_html(build_weather_map(weather, forecast))
+    return daily_summary(df)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full vs incremental forecast refresh")
+    parser.add_argument("--cities", type=int, default=50)
+    parser.add_argument("--cycles", type=int, default=4)
+    parser.add_argument("--changed", type=float, default=0.3, help="fraction of cities whose forecast changes per cycle")
+    parser.add_argument("--slots", type=int, default=3, help="slots that change in a changed forecast")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(7)
+    fixtures = load_fixtures()
+    weather = CurrentWeather.from_json(fixtures['weather'])
+    timezone_offset = weather.timezone
+    raw = city_forecasts(fixtures, args.cities)
+    now = fixtures['forecast']['list'][0]['dt']
+
+    store = ForecastStore()
+    outputs = {}  # city index -> (forecast version, map version, summary)
+    for i, forecast in enumerate(raw):
+        record, _ = store.merge(Forecast.from_json(forecast), now)
+        outputs[i] = (record.version, map_version(weather, record), render_all(weather, record, timezone_offset))
+    render_all(weather, Forecast.from_json(raw[0]), timezone_offset)  # Warm-up
+
+    full, incremental = [], []
+    rebuilt = {'frames': 0, 'summaries_patched': 0, 'maps': 0, 'unchanged': 0}
+    for _ in range(args.cycles):
+        for i in rng.sample(range(args.cities), int(args.cities * args.changed)):
+            mutate(raw[i], rng, args.slots)
+        records = [Forecast.from_json(forecast) for forecast in raw]
+
+        started = time.perf_counter()
+        for record in records:
+            render_all(weather, record, timezone_offset)
+        full.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for i, record in enumerate(records):
+            merged, changes = store.merge(record, now)
+            if not changes:
+                rebuilt['unchanged'] += 1
+                continue
+            _, old_map_version, summary = outputs[i]
+            df = normalize_forecast(merged, timezone_offset)
+            build_temperature_figure(df), build_humidity_figure(df)
+            summary = update_daily_summary(summary, df, changes.dates(timezone_offset))
+            new_map_version = map_version(weather, merged)
+            if new_map_version != old_map_version:
+                render_map_html(build_weather_map(weather, merged))
+                rebuilt['maps'] += 1
+            outputs[i] = (merged.version, new_map_version, summary)
+            rebuilt['frames'] += 1
+            rebuilt['summaries_patched'] += 1
+        incremental.append(time.perf_counter() - started)
+
+    print(json.dumps({
+        'config': vars(args),
+        'full_ms_per_cycle': round(statistics.fmean(full) * 1000, 1),
+        'incremental_ms_per_cycle': round(statistics.fmean(incremental) * 1000, 1),
+        'speedup': round(statistics.fmean(full) / statistics.fmean(incremental), 2),
+        'incremental_work': rebuilt,
+        'store': store.stats()
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
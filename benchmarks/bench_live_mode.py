@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Live mode cost with many open tabs
+
+Simulates --tabs live sessions spread over --cities cities. Every round each
+tab does what one live fragment run does before rendering (check in with
+the watcher registry and read its city from the shared cache). Between
+rounds all cache entries are made stale, so every round would re-fetch
+everything if tabs polled upstream themselves:
+
+    python benchmarks/bench_live_mode.py --tabs 2000 --cities 20 --rounds 3
+
+Reports the per-run cost (microseconds) and how many upstream requests the
+mock API saw per round. That number should track the city count, not the
+tab count.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from mock_server import MockServer
+from run_benchmarks import API_KEY, configure_environment, summarize
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cost of many live-mode tabs")
+    parser.add_argument("--tabs", type=int, default=2000)
+    parser.add_argument("--cities", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    server = MockServer(latency=0.02, seed=0).start()
+    configure_environment(server.url, tempfile.mkdtemp(prefix="weather-bench-"))
+    os.environ.update({'REFRESH_BUDGET_PER_MIN': '100000', 'REFRESH_INTERVAL': '0.2', 'LIVE_MAX_WATCHERS': str(args.tabs)})
+
+    from live_mode import LiveWatchers
+    from weather_api import cached_city, fetch_cities, refresher
+    from weather_cache import response_cache
+
+    cities = [f"Live City {i}" for i in range(args.cities)]
+    fetch_cities(cities, API_KEY)
+    watchers = LiveWatchers(max_watchers=args.tabs)
+
+    samples, upstream = [], []
+    for _ in range(args.rounds):
+        # Age every entry into the stale window so each read wants a refresh
+        with response_cache._lock:
+            for key, (value, _, size) in list(response_cache._entries.items()):
+                response_cache._entries[key] = (value, time.time() - 1, size)
+        before = server.requests
+        for tab in range(args.tabs):
+            city = cities[tab % len(cities)]
+            started = time.perf_counter()
+            watchers.touch(tab, city)
+            cached_city(city, API_KEY)
+            samples.append(time.perf_counter() - started)
+        time.sleep(1.0)  # let the refresher drain its queue
+        upstream.append(server.requests - before)
+    server.stop()
+
+    print(json.dumps({
+        'config': vars(args),
+        'live_run': {key.replace('_ms', '_us'): round(value * 1000, 1) if key.endswith('_ms') else value
+                     for key, value in summarize(samples).items()},
+        'upstream_requests_per_round': upstream,
+        'watchers': watchers.stats(),
+        'refresher': refresher.stats()
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Ingestion and query benchmark for the observation store
+
+Loads synthetic hourly observations for many cities into a fresh database
+and times the two app queries:
+
+    python benchmarks/bench_observation_store.py --cities 1000 --hours 1000
+
+Prints one JSON document with rows/s for ingestion and p50/p95 latencies
+(milliseconds) for last_hours() and at_time().
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from observation_store import ObservationStore
+
+BATCH_ROWS = 50000
+
+
+def synthetic_rows(cities, hours, start):
+    """Hourly observations, time-major like a real ingest stream"""
+    rng = random.Random(42)
+    for hour in range(hours):
+        observed_at = start + hour * 3600
+        for city_id in range(1, cities + 1):
+            temp = round(rng.uniform(-10, 35), 2)
+            yield (
+                city_id, f"City {city_id}", observed_at, observed_at + 30, temp, temp - 1.5,
+                rng.randint(20, 100), rng.randint(980, 1040), round(rng.uniform(0, 15), 1),
+                rng.randint(0, 100), 'clear sky', '01d'
+            )
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {
+        'p50_ms': round(statistics.median(samples) * 1000, 3),
+        'p95_ms': round(samples[int(len(samples) * 0.95) - 1] * 1000, 3)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the observation store")
+    parser.add_argument("--cities", type=int, default=1000)
+    parser.add_argument("--hours", type=int, default=1000, help="observations per city")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--db", help="database path (default: a temporary file)")
+    args = parser.parse_args(argv)
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="obs-bench-"), "observations.sqlite3")
+    store = ObservationStore(path)
+    start = int(time.time()) - args.hours * 3600
+
+    started = time.perf_counter()
+    batch = []
+    for row in synthetic_rows(args.cities, args.hours, start):
+        batch.append(row)
+        if len(batch) >= BATCH_ROWS:
+            store.ingest('observations', batch)
+            batch = []
+    if batch:
+        store.ingest('observations', batch)
+    ingest_seconds = time.perf_counter() - started
+    rows = args.cities * args.hours
+
+    rng = random.Random(7)
+    last_hours, last_hours_rows = [], 0
+    for _ in range(args.queries):
+        t = time.perf_counter()
+        last_hours_rows += len(store.last_hours(rng.randint(1, args.cities), hours=24))
+        last_hours.append(time.perf_counter() - t)
+
+    at_time, at_time_rows = [], 0
+    for _ in range(args.queries):
+        timestamp = start + rng.randint(1, args.hours - 1) * 3600
+        t = time.perf_counter()
+        at_time_rows += len(store.at_time(timestamp))
+        at_time.append(time.perf_counter() - t)
+
+    print(json.dumps({
+        'rows': rows,
+        'cities': args.cities,
+        'db_bytes': os.path.getsize(path),
+        'ingest_seconds': round(ingest_seconds, 2),
+        'ingest_rows_per_s': round(rows / ingest_seconds),
+        'last_hours_24h': dict(percentiles(last_hours), avg_rows=round(last_hours_rows / args.queries, 1)),
+        'at_time': dict(percentiles(at_time), avg_rows=round(at_time_rows / args.queries, 1))
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
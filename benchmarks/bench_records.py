@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Memory and parse-time benchmark for the compact weather records
+
+Compares raw OpenWeatherMap JSON (what the cache and sessions held before)
+with the CurrentWeather/Forecast records from records.py:
+
+    python benchmarks/bench_records.py --cities 500 --sessions 200
+
+    cache_bytes_per_city    memory retained by one city's /weather + /forecast
+                            pair in the shared cache (tracemalloc)
+    session_bytes           memory retained by `sessions` sessions that each
+                            keep their own copy of a few cities in session
+                            state (a pickle round-trip, as when session state
+                            has to be serializable)
+    parse_ms                time to turn one response pair into records
+
+Prints one JSON document.
+"""
+
+import argparse
+import copy
+import gc
+import json
+import os
+import pickle
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from mock_server import load_fixtures, city_variant
+from records import CurrentWeather, Forecast
+
+
+def city_payloads(fixtures, cities):
+    """Per-city response bytes, varied like the mock server varies them"""
+    payloads = []
+    for i in range(cities):
+        city_id, lat, lon, shift = city_variant(f"City {i}")
+        weather, forecast = copy.deepcopy(fixtures['weather']), copy.deepcopy(fixtures['forecast'])
+        weather.update({'id': city_id, 'name': f"City {i}", 'coord': {'lat': lat, 'lon': lon}})
+        weather['main']['temp'] = round(weather['main']['temp'] + shift, 2)
+        forecast['city'].update({'id': city_id, 'name': f"City {i}", 'coord': {'lat': lat, 'lon': lon}})
+        for item in forecast['list']:
+            item['main']['temp'] = round(item['main']['temp'] + shift, 2)
+        payloads.append((json.dumps(weather).encode('utf-8'), json.dumps(forecast).encode('utf-8')))
+    return payloads
+
+
+def parse_raw(weather_bytes, forecast_bytes):
+    return json.loads(weather_bytes), json.loads(forecast_bytes)
+
+
+def parse_records(weather_bytes, forecast_bytes):
+    return CurrentWeather.from_json(json.loads(weather_bytes)), Forecast.from_json(json.loads(forecast_bytes))
+
+
+def retained(build):
+    """Bytes still allocated after build() returns, with its result kept alive"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def measure(parse, payloads, sessions, cities_per_session, seed=1):
+    cache_bytes, cache = retained(lambda: [parse(*payload) for payload in payloads])
+
+    def build_sessions():
+        rng = random.Random(seed)
+        return [
+            [pickle.loads(pickle.dumps(rng.choice(cache))) for _ in range(cities_per_session)]
+            for _ in range(sessions)
+        ]
+
+    session_bytes, _ = retained(build_sessions)
+    return {
+        'cache_bytes_per_city': round(cache_bytes / len(payloads)),
+        'session_bytes': round(session_bytes / sessions)
+    }
+
+
+def parse_time(payloads, iterations):
+    samples = []
+    for _ in range(iterations):
+        for payload in payloads:
+            started = time.perf_counter()
+            parse_records(*payload)
+            samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        'p50_ms': round(statistics.median(samples) * 1000, 4),
+        'p95_ms': round(samples[int(0.95 * (len(samples) - 1))] * 1000, 4)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare raw JSON and record memory use")
+    parser.add_argument("--cities", type=int, default=500, help="cities in the shared cache")
+    parser.add_argument("--sessions", type=int, default=200, help="simulated sessions")
+    parser.add_argument("--cities-per-session", type=int, default=3, help="cities each session keeps")
+    parser.add_argument("--iterations", type=int, default=3, help="parse timing passes over all cities")
+    args = parser.parse_args(argv)
+
+    payloads = city_payloads(load_fixtures(), args.cities)
+    raw = measure(parse_raw, payloads, args.sessions, args.cities_per_session)
+    records = measure(parse_records, payloads, args.sessions, args.cities_per_session)
+    report = {
+        'config': vars(args),
+        'raw_json': raw,
+        'records': records,
+        'reduction': {
+            key: round(1 - records[key] / raw[key], 3) for key in raw if raw[key]
+        },
+        'parse_ms': parse_time(payloads, args.iterations)
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
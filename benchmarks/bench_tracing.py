@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Overhead benchmark for tracing spans
+
+    python benchmarks/bench_tracing.py
+
+Prints one JSON document with the cost of an empty span (enabled and
+disabled), of the timed() decorator and of rendering the Prometheus text.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tracing import Tracer
+
+ITERATIONS = 200000
+
+
+def per_call_us(fn, iterations=ITERATIONS):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return round((time.perf_counter() - started) / iterations * 1e6, 3)
+
+
+def main():
+    enabled = Tracer(enabled=True)
+    disabled = Tracer(enabled=False)
+
+    def empty_span(tracer):
+        with tracer.span("bench.stage"):
+            pass
+
+    @enabled.timed("bench.decorated")
+    def decorated():
+        pass
+
+    baseline = per_call_us(lambda: None)
+    for i in range(20):
+        enabled.record(f"bench.stage{i}", 0.001 * i)
+    started = time.perf_counter()
+    text = enabled.prometheus_text()
+    render_ms = (time.perf_counter() - started) * 1000
+
+    print(json.dumps({
+        'baseline_call_us': baseline,
+        'span_enabled_us': per_call_us(lambda: empty_span(enabled)),
+        'span_disabled_us': per_call_us(lambda: empty_span(disabled)),
+        'timed_decorator_us': per_call_us(decorated),
+        'prometheus_text_ms': round(render_ms, 3),
+        'prometheus_text_lines': len(text.splitlines())
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
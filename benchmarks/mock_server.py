@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for OpenWeatherMap and NewsAPI
+
+Replays the recorded responses in benchmarks/fixtures/ with configurable
+latency and error injection. Every city gets its own stable variant of the
+recordings (name, id, coordinates and temperatures), so caches behave as
+they would against the real API. Forecast slots are moved to start at the
+current 3-hour slot. Cities whose name starts with "nowhere"
+return 404.
+
+Run it on its own and point the app at it:
+
+    python benchmarks/mock_server.py --port 8089 --latency 0.08
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8089/data/2.5 \\
+    NEWS_API_URL=http://127.0.0.1:8089/v2/everything streamlit run app.py
+
+or start it in-process with MockServer(...).start() (see run_benchmarks.py).
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURES = ("weather", "forecast", "everything")
+SLOT_SECONDS = 3 * 3600  # /forecast slot length
+
+
+def load_fixtures(path=FIXTURES_DIR):
+    fixtures = {}
+    for name in FIXTURES:
+        with open(os.path.join(path, f"{name}.json"), encoding="utf-8") as f:
+            fixtures[name] = json.load(f)
+    return fixtures
+
+
+def city_variant(city):
+    """Stable (id, lat, lon, temperature shift) for a city name"""
+    digest = zlib.crc32(city.strip().lower().encode("utf-8"))
+    lat = (digest % 12000) / 100 - 60
+    lon = ((digest >> 8) % 36000) / 100 - 180
+    return 1000000 + digest % 9000000, round(lat, 4), round(lon, 4), ((digest >> 16) % 300) / 10 - 15
+
+
+class MockServer:
+    """Threaded HTTP server replaying the fixtures"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_status=503, throttle_rate=0.0, seed=None, fixtures_dir=FIXTURES_DIR):
+        self.latency = latency  # seconds added to every response
+        self.jitter = jitter  # extra uniform random delay, seconds
+        self.error_rate = error_rate  # fraction answered with error_status
+        self.error_status = error_status
+        self.throttle_rate = throttle_rate  # fraction answered 429 with Retry-After
+        self.fixtures = load_fixtures(fixtures_dir)
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._variants = {}
+        self._places = {}  # (lat, lon) strings -> city, for coordinate queries
+        self._server = _Server((host, port), _handler(self))
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve on the calling thread (for running the mock on its own)"""
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(self, path, query):
+        """Return (status, headers, body dict) for one request"""
+        with self._lock:
+            self.requests += 1
+            roll = self._random.random()
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+
+        if roll < self.throttle_rate:
+            self._count_error()
+            return 429, {"Retry-After": "1"}, {"cod": 429, "message": "rate limit (injected)"}
+        if roll < self.throttle_rate + self.error_rate:
+            self._count_error()
+            return self.error_status, {}, {"cod": self.error_status, "message": "error (injected)"}
+
+        if path.endswith("/everything"):
+            return 200, {}, self.fixtures["everything"]
+        endpoint = path.rstrip("/").rsplit("/", 1)[-1]
+        if endpoint not in ("weather", "forecast"):
+            return 404, {}, {"cod": "404", "message": "unknown endpoint"}
+
+        city = query.get("q") or self._places.get((query.get("lat"), query.get("lon")))
+        if city is None:
+            city = f"{query.get('lat')},{query.get('lon')}"
+        if city.lower().startswith("nowhere"):
+            return 404, {}, {"cod": "404", "message": "city not found"}
+        return 200, {}, self._variant(endpoint, city)
+
+    def _variant(self, endpoint, city):
+        key = (endpoint, city.lower())
+        body = self._variants.get(key)
+        if body is None:
+            body = self._variants[key] = self._build_variant(endpoint, city)
+        return body
+
+    def _build_variant(self, endpoint, city):
+        city_id, lat, lon, shift = city_variant(city)
+        self._places[(str(lat), str(lon))] = city
+        name = city.split(",")[0].strip().title()
+        body = copy.deepcopy(self.fixtures[endpoint])
+        if endpoint == "weather":
+            body.update({"id": city_id, "name": name, "coord": {"lat": lat, "lon": lon}})
+            for field in ("temp", "feels_like", "temp_min", "temp_max"):
+                body["main"][field] = round(body["main"][field] + shift, 2)
+        else:
+            body["city"].update({"id": city_id, "name": name, "coord": {"lat": lat, "lon": lon}})
+            # Move the recorded slots so the first one is the current 3-hour slot,
+            # like a live response (old slots would be dropped as already passed)
+            offset = (int(time.time()) // SLOT_SECONDS * SLOT_SECONDS) - body["list"][0]["dt"]
+            for item in body["list"]:
+                item["dt"] += offset
+                item["dt_txt"] = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(item["dt"]))
+                for field in ("temp", "feels_like", "temp_min", "temp_max"):
+                    item["main"][field] = round(item["main"][field] + shift, 2)
+        return body
+
+    def _count_error(self):
+        with self._lock:
+            self.errors += 1
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # accept bursts of hundreds of concurrent connections
+
+
+def _handler(mock):
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            status, headers, body = mock.respond(parts.path, dict(parse_qsl(parts.query)))
+            payload = json.dumps(body, separators=(",", ":")).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded OpenWeatherMap/NewsAPI responses")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of responses that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of responses that are 429")
+    args = parser.parse_args(argv)
+
+    server = MockServer(
+        args.host, args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        error_status=args.error_status, throttle_rate=args.throttle_rate
+    )
+    print(f"🧪 Mock OpenWeatherMap/NewsAPI on {server.url} (Ctrl+C to stop)")
+    print(f"   OPENWEATHER_BASE_URL={server.url}/data/2.5")
+    print(f"   NEWS_API_URL={server.url}/v2/everything")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
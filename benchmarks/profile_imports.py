@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Import-time profile and cold-start check for the Weather App
+
+    python benchmarks/profile_imports.py [-o imports.json]
+
+Each measurement runs in a fresh interpreter so nothing is already cached:
+
+    imports       cumulative import time of the app's own modules and the
+                  heavy libraries, from `python -X importtime`
+    heaviest      the slowest individual imports when loading the app modules
+    first_render  wall time of a first AppTest run of app.py (what a cold
+                  process does before it can send the first page) and which
+                  heavy libraries that run actually loaded
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP_MODULES = [
+    "news_feed", "weather_api", "forecast", "charts", "build_assets", "city_index",
+    "observation_store", "tracing"
+]
+HEAVY_MODULES = ["streamlit", "pandas", "numpy", "plotly.graph_objects", "plotly.express", "folium", "pyarrow"]
+
+FIRST_RENDER = """
+import os, sys, time, json
+os.environ.pop("OPENWEATHER_API_KEY", None)
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=120).run()
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "seconds": round(elapsed, 3),
+    "exception": [str(e.value) for e in at.exception],
+    "loaded": sorted(m for m in %r if m in sys.modules)
+}))
+"""
+
+
+def import_profile(statement):
+    """Run statement under -X importtime; returns {module: (self_us, cumulative_us)}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_DIR, capture_output=True, text=True, env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        modules[name] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile import times and the first render")
+    parser.add_argument("-o", "--output", help="write the report JSON here (default: stdout)")
+    parser.add_argument("--top", type=int, default=15, help="heaviest imports to list")
+    args = parser.parse_args(argv)
+
+    imports = {}
+    for module in APP_MODULES + HEAVY_MODULES:
+        profile = import_profile(f"import {module}")
+        imports[module] = round(profile.get(module, (0, 0))[1] / 1000, 1)
+
+    app_profile = import_profile("; ".join(f"import {module}" for module in APP_MODULES))
+    heaviest = sorted(app_profile.items(), key=lambda item: -item[1][0])[:args.top]
+
+    first_render = subprocess.run(
+        [sys.executable, "-c", FIRST_RENDER % (HEAVY_MODULES,)], cwd=REPO_DIR, capture_output=True, text=True
+    )
+    try:
+        first_render_report = json.loads(first_render.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        first_render_report = {"error": first_render.stderr.strip().splitlines()[-1:] or "no output"}
+
+    report = {
+        "imports_ms": imports,
+        "app_modules_total_ms": round(sum(self_us for self_us, _ in app_profile.values()) / 1000, 1),
+        "heaviest_self_ms": {name.strip(): round(self_us / 1000, 1) for name, (self_us, _) in heaviest},
+        "first_render": first_render_report
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"✅ Import profile written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
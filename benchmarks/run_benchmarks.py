@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark harness for the Weather App
+
+Starts the mock OpenWeatherMap/NewsAPI server (benchmarks/mock_server.py),
+points the app's fetch layer at it and measures:
+
+    fetch_cold      fetch_city() for cities not yet cached
+    fetch_warm      fetch_city() for cities already cached
+    forecast        normalize_forecast() (raw JSON, i.e. parse included) and
+                    daily_summary() on the recorded forecast
+    figures         temperature/humidity figures and the folium map HTML
+    news            one NewsAPI fetch
+    sessions        many concurrent simulated sessions rendering a city page
+
+Results are written as JSON (stdout, or --output) with the git commit and
+configuration, so runs can be compared over time:
+
+    python benchmarks/run_benchmarks.py -o before.json
+    python benchmarks/run_benchmarks.py --baseline before.json
+
+With --baseline, timings that got slower than --max-regression (default
+20%) are listed and the exit status is 1.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from mock_server import MockServer, load_fixtures
+
+API_KEY = "benchmark"
+
+
+def summarize(samples):
+    """count/mean/p50/p95/p99/max of a list of durations in seconds, as milliseconds"""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def percentile(q):
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)] * 1000
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p50_ms': round(percentile(0.50), 3),
+        'p95_ms': round(percentile(0.95), 3),
+        'p99_ms': round(percentile(0.99), 3),
+        'max_ms': round(ordered[-1] * 1000, 3)
+    }
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+def configure_environment(server_url, data_dir, backend="async"):
+    """Point the app modules at the mock server; must run before they are imported"""
+    os.environ.update({
+        'FETCH_BACKEND': backend,
+        'OPENWEATHER_BASE_URL': f"{server_url}/data/2.5",
+        'NEWS_API_URL': f"{server_url}/v2/everything",
+        'NEWS_API_KEY': API_KEY,
+        'WEATHER_DATA_DIR': data_dir,
+        'OWM_CALLS_PER_MINUTE': '1000000',  # measure the app, not the request budget
+        'NEWS_CALLS_PER_MINUTE': '1000000',
+        'HOT_CITIES_COUNT': '0',  # no background refreshes competing with the measurements
+    })
+    os.environ.pop('RATE_LIMIT_DB', None)
+
+
+def bench_fetch(cities):
+    from weather_api import fetch_city
+    samples, failures = [], 0
+    for city in cities:
+        seconds, (results, errors) = timed(fetch_city, city, API_KEY)
+        samples.append(seconds)
+        failures += bool(errors)
+    return dict(summarize(samples), failures=failures)
+
+
+def bench_forecast(fixtures, iterations):
+    from forecast import normalize_forecast, daily_summary
+    daily_summary(normalize_forecast(fixtures['forecast']))  # Warm-up, not measured
+    normalize, summary = [], []
+    for _ in range(iterations):
+        seconds, df = timed(normalize_forecast, fixtures['forecast'])
+        normalize.append(seconds)
+        seconds, _ = timed(daily_summary, df)
+        summary.append(seconds)
+    return {'normalize': summarize(normalize), 'daily_summary': summarize(summary)}
+
+
+def bench_figures(fixtures, iterations):
+    from charts import build_temperature_figure, build_humidity_figure, build_weather_map, render_map_html
+    from forecast import normalize_forecast
+    from records import CurrentWeather, Forecast
+    weather, forecast = CurrentWeather.from_json(fixtures['weather']), Forecast.from_json(fixtures['forecast'])
+    df = normalize_forecast(forecast)
+    build_temperature_figure(df), build_humidity_figure(df)  # Warm-up: the first figure loads Plotly's validators
+    temperature, humidity, weather_map = [], [], []
+    for _ in range(iterations):
+        temperature.append(timed(build_temperature_figure, df)[0])
+        humidity.append(timed(build_humidity_figure, df)[0])
+        weather_map.append(timed(lambda: render_map_html(build_weather_map(weather, forecast)))[0])
+    return {
+        'temperature_chart': summarize(temperature),
+        'humidity_chart': summarize(humidity),
+        'map_html': summarize(weather_map)
+    }
+
+
+def bench_news(iterations):
+    from news_feed import fetch_weather_news
+    return summarize([timed(fetch_weather_news, API_KEY)[0] for _ in range(iterations)])
+
+
+def render_page(city):
+    """What one 'Get Weather' rerun does outside Streamlit itself"""
+    from charts import (
+        cached_render, payload_version, map_version, build_temperature_figure, build_humidity_figure,
+        build_weather_map, render_map_html
+    )
+    from forecast import normalize_forecast, daily_summary
+    from weather_api import fetch_city
+
+    results, errors = fetch_city(city, API_KEY)
+    weather_data, forecast_data = results.get('weather'), results.get('forecast')
+    if not weather_data or not forecast_data:
+        return False
+    timezone_offset = weather_data.timezone
+    version = payload_version(forecast_data, timezone_offset)
+    df = cached_render('forecast_frame', version, lambda: normalize_forecast(forecast_data, timezone_offset))
+    cached_render('temperature_chart', version, lambda: build_temperature_figure(df))
+    cached_render('humidity_chart', version, lambda: build_humidity_figure(df))
+    cached_render('daily_summary', version, lambda: daily_summary(df))
+    cached_render(
+        'weather_map', map_version(weather_data, forecast_data),
+        lambda: render_map_html(build_weather_map(weather_data, forecast_data))
+    )
+    return True
+
+
+def bench_sessions(sessions, pages, city_pool, seed=1):
+    """Concurrent sessions each rendering `pages` pages for random cities from a shared pool"""
+    samples, failures = [], [0]
+    lock = threading.Lock()
+    cities = [f"Session City {i}" for i in range(city_pool)]
+
+    def session(index):
+        rng = random.Random(seed + index)
+        for _ in range(pages):
+            seconds, ok = timed(render_page, rng.choice(cities))
+            with lock:
+                samples.append(seconds)
+                failures[0] += not ok
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return dict(
+        summarize(samples), failures=failures[0], sessions=sessions,
+        pages_per_s=round(len(samples) / elapsed, 2), elapsed_s=round(elapsed, 3)
+    )
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results, prefix=""):
+    """{'a': {'p50_ms': 1}} -> {'a.p50_ms': 1} for the timing fields"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif key in ('mean_ms', 'p50_ms', 'p95_ms'):
+            flat[name] = value
+    return flat
+
+
+def compare(current, baseline, max_regression):
+    """Print timing changes against a baseline run; returns the regressions"""
+    now, before = flatten(current['results']), flatten(baseline['results'])
+    regressions = []
+    print(f"\n📊 Compared with {baseline.get('commit') or 'baseline'} ({baseline.get('timestamp', '?')})", file=sys.stderr)
+    for name in sorted(now.keys() & before.keys()):
+        if not before[name]:
+            continue
+        change = (now[name] - before[name]) / before[name]
+        marker = "🔴" if change > max_regression else "🟢" if change < -max_regression else "  "
+        print(f"{marker} {name:45} {before[name]:10.3f} -> {now[name]:10.3f} ms ({change:+.1%})", file=sys.stderr)
+        if change > max_regression:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Weather App against a local mock API")
+    parser.add_argument("-o", "--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.20, help="allowed slowdown before failing (default: 0.20)")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock API latency in seconds (default: 0.05)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="mock API random extra latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of mock API calls that fail")
+    parser.add_argument("--backend", choices=("async", "threads"), default="async", help="fetch backend (default: async)")
+    parser.add_argument("--cities", type=int, default=30, help="cities for the fetch benchmarks")
+    parser.add_argument("--iterations", type=int, default=30, help="repetitions for CPU-bound benchmarks")
+    parser.add_argument("--sessions", type=int, default=32, help="concurrent simulated sessions")
+    parser.add_argument("--pages", type=int, default=10, help="pages rendered per session")
+    args = parser.parse_args(argv)
+
+    server = MockServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=0).start()
+    configure_environment(server.url, tempfile.mkdtemp(prefix="weather-bench-"), args.backend)
+    fixtures = load_fixtures()
+
+    cities = [f"Bench City {i}" for i in range(args.cities)]
+    results = {}
+    results['fetch_cold'] = bench_fetch(cities)
+    results['fetch_warm'] = bench_fetch(cities)
+    results['forecast'] = bench_forecast(fixtures, args.iterations)
+    results['figures'] = bench_figures(fixtures, args.iterations)
+    results['news'] = bench_news(max(1, args.iterations // 3))
+    upstream_before = server.requests
+    results['sessions'] = bench_sessions(args.sessions, args.pages, city_pool=args.sessions * 2)
+    results['sessions']['upstream_requests'] = server.requests - upstream_before
+    server.stop()
+
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'results': results
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"✅ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        if regressions:
+            print(f"❌ {len(regressions)} timings regressed by more than {args.max_regression:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Static asset pipeline for the Weather App
+
+The stylesheets in styles/ are concatenated, minified and written to
+styles/dist/ under a content-hashed name, with a manifest pointing at the
+current build:
+
+    python build_assets.py
+
+At runtime app.py calls load_stylesheet(), which reads the built file once
+per process (or minifies the sources in memory if no build exists yet).
+
+Streamlit serves app static files as text/plain with nosniff, so browsers
+refuse them as <link> stylesheets; the minified sheet is therefore embedded
+once per full script run instead of being linked.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+STYLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "styles")
+DIST_DIR = os.path.join(STYLES_DIR, "dist")
+MANIFEST_PATH = os.path.join(DIST_DIR, "manifest.json")
+
+# Source stylesheets, in cascade order
+STYLESHEETS = [
+    "app.css",
+    "city_input.css",
+    "refresh_button.css",
+]
+
+_stylesheet = None
+_lock = threading.Lock()
+
+
+def minify_css(css):
+    """Strip comments and redundant whitespace from a stylesheet"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    css = re.sub(r'\s+!important', '!important', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+
+def read_sources():
+    """Concatenate the source stylesheets in cascade order"""
+    parts = []
+    for name in STYLESHEETS:
+        with open(os.path.join(STYLES_DIR, name), encoding="utf-8") as f:
+            parts.append(f.read())
+    return '\n'.join(parts)
+
+
+def build():
+    """Write the minified, content-hashed stylesheet and its manifest; returns the file name"""
+    css = minify_css(read_sources())
+    digest = hashlib.sha256(css.encode("utf-8")).hexdigest()[:12]
+    filename = f"app.{digest}.min.css"
+
+    os.makedirs(DIST_DIR, exist_ok=True)
+    with open(os.path.join(DIST_DIR, filename), "w", encoding="utf-8") as f:
+        f.write(css)
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump({"app.css": filename}, f, indent=2)
+
+    # Remove builds the manifest no longer points at
+    for name in os.listdir(DIST_DIR):
+        if name.endswith(".min.css") and name != filename:
+            os.remove(os.path.join(DIST_DIR, name))
+    return filename
+
+
+def load_stylesheet():
+    """Return the minified stylesheet, loading it only once per process"""
+    global _stylesheet
+    if _stylesheet is None:
+        with _lock:
+            if _stylesheet is None:
+                try:
+                    with open(MANIFEST_PATH, encoding="utf-8") as f:
+                        filename = json.load(f)["app.css"]
+                    with open(os.path.join(DIST_DIR, filename), encoding="utf-8") as f:
+                        _stylesheet = f.read()
+                except (OSError, ValueError, KeyError):
+                    # No build yet: minify the sources in memory
+                    _stylesheet = minify_css(read_sources())
+    return _stylesheet
+
+
+def main():
+    filename = build()
+    size = os.path.getsize(os.path.join(DIST_DIR, filename))
+    source_size = len(read_sources().encode("utf-8"))
+    print(f"✅ Built styles/dist/{filename} ({size:,} bytes, {source_size:,} bytes before minifying)")
+
+
+if __name__ == "__main__":
+    main()
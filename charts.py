@@ -0,0 +1,347 @@
+"""
+Chart and map builders for the Weather App, plus a render cache
+
+Building the Plotly figures and especially the folium map HTML is the most
+expensive part of a rerun. Results are memoized per data version (a content
+hash of the payload they were built from), so reruns that do not change the
+data (tab switches, the news button) reuse the previous output.
+
+Plotly and folium are imported inside the builders, so they load when the
+first chart or map is drawn rather than when the app starts. Series are
+decimated (decimation.py) before they are plotted, on datetime axes.
+"""
+
+import hashlib
+import json
+import math
+import os
+
+from decimation import decimate
+from forecast import normalize_forecast, get_weather_icon
+from tracing import tracer
+from weather_cache import ResponseCache
+
+# Render cache configuration
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))  # 16 MB
+RENDER_CACHE_TTL = 6 * 3600  # outputs never go stale for a given version; this only bounds their lifetime
+MAP_FORECAST_SLOTS = 4  # upcoming forecast slots shown as map markers
+MARKER_MAX_POINTS = 60  # past this many points lines are drawn plain (no markers or spline smoothing)
+DATE_HOVER_FORMAT = '%a %d %b, %H:%M'
+
+
+def _render_size(value):
+    """Approximate size of a cached render in bytes"""
+    if isinstance(value, str):
+        return len(value)
+    if hasattr(value, 'to_plotly_json'):  # Plotly figure
+        return len(value.to_json())
+    if hasattr(value, 'memory_usage'):  # DataFrame
+        return int(value.memory_usage(deep=True).sum())
+    return 1024
+
+
+render_cache = ResponseCache(max_bytes=RENDER_CACHE_MAX_BYTES, stale_ttl=0, size_of=_render_size)
+tracer.register_stats("render_cache", render_cache.stats)
+
+
+def payload_version(*payloads):
+    """Content hash identifying the data a view is built from
+
+    Records contribute the version they were parsed with instead of being
+    serialized again.
+    """
+    digest = hashlib.sha1()
+    for payload in payloads:
+        version = getattr(payload, 'version', None)
+        if version is not None:
+            digest.update(version.encode('utf-8'))
+            continue
+        digest.update(json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def cached_render(kind, version, build):
+    """Return the cached output of build() for (kind, version), building it on a miss"""
+    key = (kind, version)
+    value = render_cache.get(key)
+    if value is None:
+        with tracer.span(f"build.{kind}"):
+            value = build()
+        render_cache.set(key, value, RENDER_CACHE_TTL)
+    return value
+
+
+def build_temperature_figure(df, max_points=None):
+    """Temperature line chart coloured by temperature band"""
+    import plotly.graph_objects as go
+
+    points = decimate(df, 'Datetime', 'Temperature (°C)', max_points)
+    detailed = len(points) <= MARKER_MAX_POINTS
+
+    # Simple temperature chart without problematic HTML
+    fig_temp = go.Figure()
+
+    fig_temp.add_trace(go.Scatter(
+        x=points['Datetime'].to_numpy(),
+        y=points['Temperature (°C)'],
+        mode='lines+markers' if detailed else 'lines',
+        name='Temperature',
+        line=dict(
+            color='#667eea',
+            width=4 if detailed else 2,
+            shape='spline' if detailed else 'linear'
+        ),
+        marker=dict(
+            size=10, 
+            color=points['Color'].astype(str),
+            line=dict(color='white', width=2),
+            symbol='circle'
+        ) if detailed else None,
+        fill='tonexty',
+        fillcolor='rgba(102, 126, 234, 0.1)'
+    ))
+
+    fig_temp.update_layout(
+        title='🌡️ Temperature Forecast',
+        xaxis=dict(title="Local time", type='date', hoverformat=DATE_HOVER_FORMAT),
+        yaxis_title="Temperature (°C)",
+        template='plotly_white',
+        height=350,
+        showlegend=False
+    )
+
+    return fig_temp
+
+
+def build_humidity_figure(df, max_points=None):
+    """Humidity bar chart"""
+    import plotly.graph_objects as go
+
+    # Bars keep each bucket's driest and most humid slot
+    points = decimate(df, 'Datetime', 'Humidity (%)', max_points, method='minmax')
+
+    # Simple humidity chart
+    fig_humidity = go.Figure()
+
+    fig_humidity.add_trace(go.Bar(
+        x=points['Datetime'].to_numpy(),
+        y=points['Humidity (%)'],
+        name='Humidity',
+        marker_color='#764ba2',
+        opacity=0.8
+    ))
+
+    fig_humidity.update_layout(
+        title='💧 Humidity Forecast',
+        xaxis=dict(title="Local time", type='date', hoverformat=DATE_HOVER_FORMAT),
+        yaxis_title="Humidity (%)",
+        template='plotly_white',
+        height=350,
+        showlegend=False
+    )
+
+    return fig_humidity
+
+
+def build_comparison_figure(df, max_points=None):
+    """One figure overlaying the temperature forecast of every city in a stacked frame"""
+    import plotly.graph_objects as go
+
+    fig_compare = go.Figure()
+
+    for city, city_df in df.groupby('City', observed=True, sort=False):
+        city_df = decimate(city_df, 'Datetime', 'Temperature (°C)', max_points)
+        fig_compare.add_trace(go.Scatter(
+            x=city_df['Datetime'].to_numpy(),
+            y=city_df['Temperature (°C)'],
+            mode='lines',
+            name=str(city),
+            line=dict(width=2)
+        ))
+
+    fig_compare.update_layout(
+        title='🌡️ Temperature Forecast Comparison',
+        xaxis=dict(title="Time (UTC)", type='date', hoverformat=DATE_HOVER_FORMAT),
+        yaxis_title="Temperature (°C)",
+        template='plotly_white',
+        height=450,
+        hovermode='x unified'
+    )
+
+    return fig_compare
+
+
+def build_history_figure(observations, timezone_offset=0, max_points=None):
+    """Temperature and feels-like history from stored observations (oldest first)"""
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    history = pd.DataFrame({
+        'Datetime': pd.to_datetime([row['observed_at'] + timezone_offset for row in observations], unit='s'),
+        'temp': [row['temp'] for row in observations],
+        'feels_like': [row['feels_like'] for row in observations]
+    })
+    # Both lines keep the points picked for the temperature curve
+    points = decimate(history, 'Datetime', 'temp', max_points)
+
+    fig_history = go.Figure()
+    fig_history.add_trace(go.Scatter(
+        x=points['Datetime'].to_numpy(),
+        y=points['temp'],
+        mode='lines+markers' if len(points) <= MARKER_MAX_POINTS else 'lines',
+        name='Temperature',
+        line=dict(color='#667eea', width=3)
+    ))
+    fig_history.add_trace(go.Scatter(
+        x=points['Datetime'].to_numpy(),
+        y=points['feels_like'],
+        mode='lines',
+        name='Feels Like',
+        line=dict(color='#f5576c', width=2, dash='dot')
+    ))
+
+    fig_history.update_layout(
+        title='📈 Last 24 Hours',
+        xaxis=dict(title="Local time", type='date', hoverformat=DATE_HOVER_FORMAT),
+        yaxis_title="Temperature (°C)",
+        template='plotly_white',
+        height=300
+    )
+
+    return fig_history
+
+
+def map_version(weather, forecast):
+    """Version of only what the map shows (current marker and the next forecast slots)
+
+    Refreshes that leave the markers alone keep the cached map.
+    """
+    upcoming = forecast.head(MAP_FORECAST_SLOTS) if forecast is not None else None
+    marker = [weather.lat, weather.lon, weather.temp, weather.description, weather.icon_code, weather.timezone]
+    return payload_version(marker, upcoming)
+
+
+def build_weather_map(weather, forecast):
+    """Folium map with the current weather marker and the next forecast slots"""
+    import folium
+
+    # Create a map centered on the city with clean styling
+    lat = weather.lat
+    lon = weather.lon
+    timezone_offset = weather.timezone
+    
+    # Create map with clean tile layer
+    m = folium.Map(
+        location=[lat, lon], 
+        zoom_start=11,
+        tiles='CartoDB positron',
+        control_scale=True
+    )
+    
+    # Add current weather marker with simple popup
+    current_temp = weather.temp
+    current_desc = weather.description
+    current_icon = get_weather_icon(weather.icon_code)
+    
+    # Simple, clean popup for current weather
+    current_popup_html = f"""
+    <div style="
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        border-radius: 12px;
+        padding: 1.5rem;
+        color: white;
+        font-family: 'Segoe UI', sans-serif;
+        min-width: 200px;
+        box-shadow: 0 8px 20px rgba(0,0,0,0.2);
+    ">
+        <div style="text-align: center;">
+            <div style="font-size: 2.5rem; margin-bottom: 0.5rem;">{current_icon}</div>
+            <h3 style="margin: 0; font-size: 1.1rem; font-weight: bold;">Current Weather</h3>
+            <div style="
+                background: rgba(255,255,255,0.1);
+                border-radius: 8px;
+                padding: 0.8rem;
+                margin-top: 0.8rem;
+            ">
+                <p style="margin: 0.3rem 0; font-size: 1rem;"><strong>{current_temp}°C</strong></p>
+                <p style="margin: 0.3rem 0; font-size: 0.9rem;">{current_desc.title()}</p>
+            </div>
+        </div>
+    </div>
+    """
+    
+    # Add current weather marker
+    folium.Marker(
+        [lat, lon],
+        popup=folium.Popup(current_popup_html, max_width=250),
+        tooltip=f"📍 {current_temp}°C - {current_desc.title()}",
+        icon=folium.Icon(color='red', icon='info-sign', prefix='fa')
+    ).add_to(m)
+    
+    # Add forecast markers if available
+    if forecast is not None and len(forecast):
+        forecast_df = normalize_forecast(forecast.head(MAP_FORECAST_SLOTS), timezone_offset)
+        
+        # Simple circle around the city
+        folium.Circle(
+            location=[lat, lon],
+            radius=3000,
+            color='#667eea',
+            fill=True,
+            fill_color='#667eea',
+            fill_opacity=0.1,
+            weight=2,
+            opacity=0.6
+        ).add_to(m)
+        
+        # Add forecast markers in a simple pattern
+        forecast_rows = zip(forecast_df['Time'], forecast_df['Temperature (°C)'], forecast_df['Weather'], forecast_df['Icon'])
+        for i, (forecast_time, forecast_temp, forecast_desc, forecast_icon) in enumerate(forecast_rows):
+            angle = (i * 90) * (3.14159 / 180)  # 90 degrees apart
+            radius = 0.015
+            forecast_lat = lat + (radius * math.cos(angle))
+            forecast_lon = lon + (radius * math.sin(angle))
+            
+            # Simple forecast popup
+            forecast_popup_html = f"""
+            <div style="
+                background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
+                border-radius: 12px;
+                padding: 1.5rem;
+                color: white;
+                font-family: 'Segoe UI', sans-serif;
+                min-width: 180px;
+                box-shadow: 0 8px 20px rgba(0,0,0,0.2);
+            ">
+                <div style="text-align: center;">
+                    <div style="font-size: 2rem; margin-bottom: 0.5rem;">{forecast_icon}</div>
+                    <h4 style="margin: 0; font-size: 1rem; font-weight: bold;">Forecast</h4>
+                    <div style="
+                        background: rgba(255,255,255,0.1);
+                        border-radius: 8px;
+                        padding: 0.8rem;
+                        margin-top: 0.8rem;
+                    ">
+                        <p style="margin: 0.3rem 0; font-size: 1rem;"><strong>{forecast_time}</strong></p>
+                        <p style="margin: 0.3rem 0; font-size: 0.9rem;"><strong>{forecast_temp}°C</strong></p>
+                        <p style="margin: 0.3rem 0; font-size: 0.8rem;">{forecast_desc.title()}</p>
+                    </div>
+                </div>
+            </div>
+            """
+            
+            folium.Marker(
+                [forecast_lat, forecast_lon],
+                popup=folium.Popup(forecast_popup_html, max_width=220),
+                tooltip=f"⏰ {forecast_time}: {forecast_temp}°C",
+                icon=folium.Icon(color='blue', icon='cloud', prefix='fa')
+            ).add_to(m)
+
+    return m
+
+
+def render_map_html(m):
+    """Render a folium map to the standalone HTML that folium_static would embed"""
+    import folium
+
+    return folium.Figure().add_child(m).render()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Offline city index for the Weather App
+
+City names are checked against a bundled, sorted index before any request
+goes to OpenWeatherMap, so typos cost no API calls and get "did you mean"
+suggestions instead, and a partly typed name gets completions. The index
+file is memory-mapped on first use and searched in place with a binary
+search, so it costs almost no memory and nothing at all until the first
+lookup.
+
+Index format (data/cities.tsv, UTF-8, sorted by key then population desc):
+
+    key<TAB>name<TAB>country code<TAB>population
+
+where key is the lowercased, accent-free name. The bundled file covers
+major cities only; build a fuller one from a GeoNames dump with:
+
+    python city_index.py cities15000.txt
+"""
+
+import difflib
+import mmap
+import os
+import sys
+import threading
+import unicodedata
+from functools import lru_cache
+
+CITY_INDEX_PATH = os.getenv(
+    "CITY_INDEX_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cities.tsv")
+)
+# Reject every unknown name (only sensible with a full GeoNames index); by
+# default only names that look like a typo of a known city are rejected
+CITY_INDEX_STRICT = os.getenv("CITY_INDEX_STRICT", "0") == "1"
+FUZZY_CUTOFF = 0.85  # difflib similarity above which an unknown name counts as a typo
+FUZZY_BLOCK_BYTES = 64 * 1024  # beyond this a fuzzy match only scans the two-letter block
+PREFIX_SCAN_LIMIT = 2000  # entries ranked per prefix query
+
+# GeoNames dump columns we use (see https://download.geonames.org/export/dump/readme.txt)
+GEONAMES_NAME = 1
+GEONAMES_ASCII_NAME = 2
+GEONAMES_COUNTRY = 8
+GEONAMES_POPULATION = 14
+
+
+def city_key(name):
+    """Lowercase, accent-free, single-spaced form used for matching"""
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.lower().split())
+
+
+def split_query(query):
+    """Split 'London, GB' style input into (name, country code or None)"""
+    name, _, country = query.partition(',')
+    country = country.strip().upper()
+    return name.strip(), (country if len(country) == 2 and country.isalpha() else None)
+
+
+def format_city(name, country):
+    """Query string OpenWeatherMap understands for a suggestion"""
+    return f"{name},{country}"
+
+
+class CityIndex:
+    """Memory-mapped sorted city list with prefix and fuzzy search"""
+
+    def __init__(self, path=CITY_INDEX_PATH, strict=CITY_INDEX_STRICT):
+        self.path = path
+        self.strict = strict
+        self._data = None
+        self._lock = threading.Lock()
+
+    def suggest(self, prefix, limit=8):
+        """Most populous cities whose name starts with prefix, as (name, country, population)"""
+        key = city_key(prefix)
+        if not key or self._load() is None:
+            return []
+        matches = list(self._scan(key, PREFIX_SCAN_LIMIT))
+        matches.sort(key=lambda entry: -entry[2])
+        return matches[:limit]
+
+    def complete(self, query, limit=5):
+        """Prefix completions for a partly typed query; none once it names a known city"""
+        try:
+            name, country = split_query(query)
+            if len(city_key(name)) < 2 or self.lookup(name, country):
+                return []
+            return [entry for entry in self.suggest(name, limit=limit) if country is None or entry[1] == country]
+        except (ValueError, IndexError, OSError):
+            return []
+
+    def lookup(self, name, country=None):
+        """Entries whose name matches exactly (optionally within one country)"""
+        key = city_key(name)
+        if not key or self._load() is None:
+            return []
+        return [
+            entry for entry in self._scan(key, PREFIX_SCAN_LIMIT, exact=True)
+            if country is None or entry[1] == country
+        ]
+
+    def closest(self, name, limit=3):
+        """Known cities that look like a misspelling of name, best first"""
+        key = city_key(name)
+        if not key or self._load() is None:
+            return []
+        return self._closest(key, limit)
+
+    def check(self, query):
+        """Decide whether a city query is worth sending upstream
+
+        Returns (ok, suggestions). Names in the index are ok. Unknown names
+        that closely resemble a known city come back not ok with suggestions;
+        unless the index is strict that is only advice (the bundled list
+        cannot hold every town OpenWeatherMap knows, and "Sevilla" is not a
+        typo of Seville), so callers should still let the user search. Other
+        unknown names pass unless the index is strict. A broken index lets
+        every query through.
+        """
+        try:
+            return self._check(query)
+        except (ValueError, IndexError, OSError):
+            return True, []
+
+    def _check(self, query):
+        if self._load() is None:
+            return True, []
+        name, country = split_query(query)
+        if self.lookup(name, country):
+            return True, []
+        if country and not self.strict and self.lookup(name):
+            return True, []  # Known name, country outside the bundled list
+        suggestions = self.closest(name) or (self.suggest(name, limit=3) if self.strict else [])
+        if suggestions or self.strict:
+            return False, suggestions
+        return True, []
+
+    @lru_cache(maxsize=1024)
+    def _closest(self, key, limit):
+        # Typos rarely change the first letter, so only cities sharing it (or the
+        # first two letters, in a big index) are compared; that block is a
+        # contiguous slice of the sorted file. Names whose length rules out
+        # reaching the cutoff are skipped before difflib sees them.
+        shortest = len(key) * FUZZY_CUTOFF / (2 - FUZZY_CUTOFF)
+        longest = len(key) * (2 - FUZZY_CUTOFF) / FUZZY_CUTOFF
+        candidates = {}
+        for line in self._block(key).split(b'\n'):
+            if not line:
+                continue  # Empty block (no city starts with this letter) or blank line
+            entry_key, name, country, population = line.decode('utf-8').split('\t')
+            if shortest <= len(entry_key) <= longest:
+                entry = (name, country, int(population))
+                if entry_key not in candidates or entry[2] > candidates[entry_key][2]:
+                    candidates[entry_key] = entry
+        matches = difflib.get_close_matches(key, list(candidates), n=limit, cutoff=FUZZY_CUTOFF)
+        return [candidates[match] for match in matches]
+
+    def _load(self):
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    try:
+                        with open(self.path, 'rb') as f:
+                            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    except (OSError, ValueError):
+                        self._data = b''  # Missing or empty index: accept everything
+        return self._data or None
+
+    def _seek(self, key):
+        """Offset of the first line whose key is >= key (str, or raw bytes)"""
+        data = self._data
+        target = key.encode('utf-8') if isinstance(key, str) else key
+        lo, hi = 0, len(data)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = data.rfind(b'\n', 0, mid) + 1
+            end = data.find(b'\n', start)
+            if end == -1:
+                end = len(data)
+            if data[start:data.find(b'\t', start, end)] < target:
+                lo = end + 1
+            else:
+                hi = start
+        return lo
+
+    def _entries(self, offset):
+        """Yield (key, (name, country, population)) from offset onwards"""
+        data = self._data
+        while offset < len(data):
+            end = data.find(b'\n', offset)
+            if end == -1:
+                end = len(data)
+            line, offset = data[offset:end], end + 1
+            if not line:
+                continue
+            key, name, country, population = line.decode('utf-8').split('\t')
+            yield key, (name, country, int(population))
+
+    def _scan(self, key, limit, exact=False):
+        for count, (entry_key, entry) in enumerate(self._entries(self._seek(key))):
+            if count >= limit or not entry_key.startswith(key) or (exact and entry_key != key):
+                return
+            yield entry
+
+    def _block(self, key):
+        """Raw lines of the cities sharing the first letter (two letters if that block is large)"""
+        for length in (1, 2):
+            prefix = key[:length].encode('utf-8')
+            start, end = self._seek(prefix), self._seek(prefix + b'\xff')
+            if end - start <= FUZZY_BLOCK_BYTES or length >= len(key):
+                break
+        return self._data[start:end].rstrip(b'\n')
+
+
+def read_geonames(path):
+    """Yield (name, country, population) from a GeoNames cities*.txt dump"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) <= GEONAMES_POPULATION:
+                continue
+            population = int(fields[GEONAMES_POPULATION] or 0)
+            yield fields[GEONAMES_NAME], fields[GEONAMES_COUNTRY], population
+            if city_key(fields[GEONAMES_ASCII_NAME]) != city_key(fields[GEONAMES_NAME]):
+                yield fields[GEONAMES_ASCII_NAME], fields[GEONAMES_COUNTRY], population
+
+
+def write_index(cities, path=CITY_INDEX_PATH):
+    """Write (name, country, population) tuples as a sorted index file; returns the entry count"""
+    best = {}
+    for name, country, population in cities:
+        key = city_key(name)
+        if not key:
+            continue
+        current = best.get((key, country))
+        if current is None or current[1] < population:
+            best[(key, country)] = (name, population)
+    entries = sorted(
+        ((key, name, country, population) for (key, country), (name, population) in best.items()),
+        key=lambda entry: (entry[0].encode('utf-8'), -entry[3])
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('\n'.join('\t'.join(map(str, entry)) for entry in entries) + '\n')
+    return len(entries)
+
+
+city_index = CityIndex()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) not in (1, 2):
+        sys.exit("Usage: python city_index.py <geonames cities*.txt> [output.tsv]")
+    output = argv[1] if len(argv) == 2 else CITY_INDEX_PATH
+    count = write_index(read_geonames(argv[0]), output)
+    print(f"✅ Wrote {count:,} cities to {output}")
+
+
+if __name__ == "__main__":
+    main()
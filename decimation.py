@@ -0,0 +1,94 @@
+"""
+Chart decimation for the Weather App
+
+A chart cannot show more points than it has pixel columns, but Plotly still
+ships and draws every point it is given. Series longer than the point
+budget are reduced before they reach a figure:
+
+    lttb_indexes    Largest-Triangle-Three-Buckets, keeps the visual shape
+                    of a line (temperature curves)
+    minmax_indexes  the lowest and highest point of every bucket, keeps
+                    the extremes (bars, noisy series)
+
+Both return row positions, so every other column of a frame (colours,
+labels) stays aligned with the points that were kept. The budget is
+derived from CHART_WIDTH_PX, so payload size and browser render time stay
+flat however long the series gets. Short series (like the 40-slot
+forecast) are passed through untouched.
+
+numpy is imported on first use, like pandas in forecast.py.
+"""
+
+import os
+
+# Decimation configuration (overridable through environment variables)
+CHART_WIDTH_PX = int(os.getenv("CHART_WIDTH_PX", "900"))  # plot area width the point budget is sized for
+CHART_PIXELS_PER_POINT = 2  # one point every two pixel columns is indistinguishable from more
+
+
+def chart_points(width_px=CHART_WIDTH_PX):
+    """Point budget for a chart width_px pixels wide"""
+    return max(3, width_px // CHART_PIXELS_PER_POINT)
+
+
+def _as_float(values):
+    """Values as a float64 array (datetimes as nanoseconds)"""
+    import numpy as np
+    values = np.asarray(values)
+    if values.dtype.kind == 'M':
+        values = values.astype('datetime64[ns]').astype('int64')
+    return values.astype('float64')
+
+
+def lttb_indexes(x, y, threshold):
+    """Positions of the `threshold` points LTTB keeps from (x, y), first and last included"""
+    import numpy as np
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x, y = _as_float(x), _as_float(y)
+
+    # threshold - 2 buckets over the points between the first and the last
+    edges = np.linspace(1, n - 1, threshold - 1).astype('int64')
+    selected = np.empty(threshold, dtype='int64')
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        # Keep the point forming the largest triangle with the previous pick and the next bucket's mean
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indexes(y, threshold):
+    """Positions of the min and max of threshold // 2 equal buckets over y, in order"""
+    import numpy as np
+    n = len(y)
+    buckets = threshold // 2
+    if threshold >= n or buckets < 1:
+        return np.arange(n)
+    y = _as_float(y)
+
+    edges = np.linspace(0, n, buckets + 1).astype('int64')
+    selected = set()
+    for start, end in zip(edges[:-1], edges[1:]):
+        bucket = y[start:end]
+        selected.add(start + int(bucket.argmin()))
+        selected.add(start + int(bucket.argmax()))
+    return np.array(sorted(selected), dtype='int64')
+
+
+def decimate(df, x, y, max_points=None, method='lttb'):
+    """Rows of df reduced to at most max_points by column y (over x), or df itself if already short enough"""
+    max_points = chart_points() if max_points is None else max_points
+    if len(df) <= max_points:
+        return df
+    if method == 'minmax':
+        indexes = minmax_indexes(df[y].to_numpy(), max_points)
+    else:
+        indexes = lttb_indexes(df[x].to_numpy(), df[y].to_numpy(), max_points)
+    return df.iloc[indexes]
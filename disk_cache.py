@@ -0,0 +1,195 @@
+"""
+Compressed on-disk cache tier for the Weather App
+
+The in-memory caches are empty after every restart, so without this tier
+all sessions would miss into OpenWeatherMap and NewsAPI at once. Every
+upstream payload is also written here, compressed (zstd when the optional
+`zstandard` package is installed, gzip otherwise), with its expiry time.
+A memory miss looks here before going upstream and loads the entry into
+memory, so each entry is read from disk at most once per process.
+
+Entries live in one SQLite file (WAL mode): writes are atomic transactions
+and several worker processes can share the file, each picking up what the
+others fetched. Writes happen on a background thread so fetches never wait
+on disk. Past DISK_CACHE_MAX_BYTES (compressed) the least recently used
+entries are dropped; entries past their stale window are dropped as well.
+"""
+
+import gzip
+import json
+import os
+import sqlite3
+import time
+
+from sqlite_writer import BatchWriter, ThreadConnections
+from weather_cache import DATA_DIR, CACHE_STALE_TTL
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DISK_CACHE_ENABLED = os.getenv("DISK_CACHE_ENABLED", "1") != "0"
+DISK_CACHE_PATH = os.getenv("DISK_CACHE_PATH", os.path.join(DATA_DIR, "response_cache.sqlite3"))
+DISK_CACHE_MAX_BYTES = int(os.getenv("DISK_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 64 MB compressed
+DISK_CACHE_CODEC = os.getenv("DISK_CACHE_CODEC", "zstd" if zstandard else "gzip")
+WRITE_BATCH_SIZE = 200
+WRITE_FLUSH_INTERVAL = 0.2  # seconds
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    payload BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_by_access ON entries (accessed_at);
+"""
+
+
+def compress(payload, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=6).compress(payload)
+    return gzip.compress(payload, compresslevel=6)
+
+
+def decompress(blob, codec):
+    """Original bytes of a stored payload; raises ValueError if it cannot be read here"""
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstd entry but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    if codec == 'gzip':
+        try:
+            return gzip.decompress(blob)
+        except (OSError, EOFError) as e:
+            raise ValueError(str(e)) from None
+    raise ValueError(f"unknown codec {codec!r}")
+
+
+class DiskCache:
+    """SQLite-backed key -> compressed payload store with TTL and a size cap"""
+
+    def __init__(self, path=DISK_CACHE_PATH, max_bytes=DISK_CACHE_MAX_BYTES, codec=DISK_CACHE_CODEC,
+                 stale_ttl=CACHE_STALE_TTL, enabled=DISK_CACHE_ENABLED):
+        if codec == 'zstd' and zstandard is None:
+            codec = 'gzip'
+        self.path = path
+        self.max_bytes = max_bytes
+        self.codec = codec
+        self.stale_ttl = stale_ttl
+        self.enabled = enabled
+        self._connections = ThreadConnections(path, _SCHEMA)
+        self._writer = BatchWriter(self._write, "disk-cache-writer", WRITE_BATCH_SIZE, WRITE_FLUSH_INTERVAL)
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def get(self, key):
+        """Return (payload, expires_at) for key, or None
+
+        Entries past their stale window count as missing, like in the
+        memory cache.
+        """
+        if not self.enabled:
+            return None
+        try:
+            row = self._connections.get().execute(
+                "SELECT codec, expires_at, payload FROM entries WHERE key = ?", (_key_text(key),)
+            ).fetchone()
+            if row is None or time.time() >= row[1] + self.stale_ttl:
+                self.misses += 1
+                return None
+            payload = decompress(row[2], row[0])
+        except (sqlite3.Error, ValueError):
+            self.errors += 1  # A broken entry only costs us one upstream call
+            return None
+        self.hits += 1
+        self._writer.put(('touch', key))
+        return payload, row[1]
+
+    def put(self, key, payload, ttl):
+        """Queue payload (bytes) for storage under key for ttl seconds (never blocks on disk)"""
+        if self.enabled:
+            self._writer.put(('put', key, payload, time.time() + ttl))
+
+    def flush(self):
+        """Wait until everything queued so far has been written"""
+        self._writer.flush()
+
+    def stats(self):
+        """Return a snapshot of the disk tier counters"""
+        return {
+            'enabled': self.enabled,
+            'codec': self.codec,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'evictions': self.evictions,
+            'errors': self.errors + self._writer.errors,
+            'compression_ratio': round(self.raw_bytes / self.stored_bytes, 2) if self.stored_bytes else None
+        }
+
+    def _write(self, items):
+        """Store one batch from the writer thread"""
+        try:
+            self._apply(items)
+        except sqlite3.Error:
+            self.errors += 1  # Losing cache entries must never break fetching
+
+    def _apply(self, items):
+        """Apply one batch of puts and touches, then enforce the size cap"""
+        now = time.time()
+        puts, touches = {}, set()
+        for item in items:
+            if item[0] == 'put':
+                puts[_key_text(item[1])] = item[2:]  # Only the newest payload per key is kept
+            else:
+                touches.add(_key_text(item[1]))
+
+        rows = []
+        for key, (payload, expires_at) in puts.items():
+            blob = compress(payload, self.codec)
+            rows.append((key, self.codec, expires_at, now, len(blob), blob))
+            self.raw_bytes += len(payload)
+            self.stored_bytes += len(blob)
+
+        conn = self._connections.get()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, codec, expires_at, accessed_at, size, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            conn.executemany("UPDATE entries SET accessed_at = ? WHERE key = ?", [(now, key) for key in touches - puts.keys()])
+            self.writes += len(rows)
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        """Drop dead entries, then least recently used ones until under max_bytes (inside the write transaction)"""
+        self.evictions += conn.execute("DELETE FROM entries WHERE expires_at + ? <= ?", (self.stale_ttl, now)).rowcount
+        excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+
+def _key_text(key):
+    """Cache keys are tuples in memory and JSON text on disk"""
+    return json.dumps(list(key) if isinstance(key, tuple) else key)
+
+
+disk_cache = DiskCache()
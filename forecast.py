@@ -0,0 +1,182 @@
+"""
+Forecast normalization for the Weather App
+
+Turns a Forecast record (records.py) into one typed DataFrame (one row per
+3-hour slot) using vectorized pandas operations, and derives the per-day summary
+from it. The same frame feeds the charts, the daily cards and the map, and
+it stacks cleanly for several cities via the optional `city` column.
+
+pandas is imported on first use, so modules that only need the icon and
+colour helpers do not pay for it at startup.
+"""
+
+WEATHER_ICONS = {
+    '01': '☀️',  # clear sky
+    '02': '⛅',  # few clouds
+    '03': '☁️',  # scattered clouds
+    '04': '☁️',  # broken clouds
+    '09': '🌧️',  # shower rain
+    '10': '🌦️',  # rain
+    '11': '⛈️',  # thunderstorm
+    '13': '🌨️',  # snow
+    '50': '🌫️',  # mist
+}
+DEFAULT_WEATHER_ICON = '🌤️'
+
+# Temperature bands: [-inf, 0) cold, [0, 15) cool, [15, 25) warm, [25, inf) hot
+TEMP_BINS = [float('-inf'), 0, 15, 25, float('inf')]
+TEMP_COLORS = [
+    '#87CEEB',  # Light blue for cold
+    '#98FB98',  # Light green for cool
+    '#FFD700',  # Gold for warm
+    '#FF6347',  # Tomato for hot
+]
+
+FORECAST_COLUMNS = ['dt', 'Temperature (°C)', 'Humidity (%)', 'Weather', 'icon_code']
+
+
+def get_weather_icon(weather_code):
+    """Get weather icon based on weather code"""
+    return WEATHER_ICONS.get(weather_code[:2], DEFAULT_WEATHER_ICON)
+
+
+def get_weather_color(temp):
+    """Get color based on temperature"""
+    if temp < 0:
+        return '#87CEEB'  # Light blue for cold
+    elif temp < 15:
+        return '#98FB98'  # Light green for cool
+    elif temp < 25:
+        return '#FFD700'  # Gold for warm
+    else:
+        return '#FF6347'  # Tomato for hot
+
+
+def _as_forecast(forecast):
+    """Accept a Forecast record or raw /forecast JSON (parsed on the fly)"""
+    from records import Forecast
+    if isinstance(forecast, Forecast):
+        return forecast
+    return Forecast.from_json(forecast)
+
+
+def _record_columns(forecast):
+    """The record's columns under the frame's column names"""
+    return {
+        'dt': forecast.dt,
+        'Temperature (°C)': forecast.temp,
+        'Humidity (%)': forecast.humidity,
+        'Weather': forecast.description,
+        'icon_code': forecast.icon_code
+    }
+
+
+def _finish_frame(df, timezone_offset):
+    """Type the raw columns and add the derived ones (offset may be a scalar or per-row Series)"""
+    import pandas as pd
+    df['dt'] = df['dt'].astype('int64')
+    df['Temperature (°C)'] = df['Temperature (°C)'].astype('float64')
+    df['Humidity (%)'] = df['Humidity (%)'].astype('float64')
+
+    # Vectorized timestamp conversion to the city's local wall-clock time
+    local = pd.to_datetime(df['dt'] + timezone_offset, unit='s')
+    df['Datetime'] = local
+    df['Date'] = local.dt.strftime('%Y-%m-%d')
+    df['Time'] = local.dt.strftime('%H:%M')
+
+    # Categorical lookups instead of per-row function calls
+    df['Weather'] = df['Weather'].astype('category')
+    df['Icon'] = pd.Categorical(df['icon_code'].str[:2].map(WEATHER_ICONS).fillna(DEFAULT_WEATHER_ICON))
+    df['Color'] = pd.cut(df['Temperature (°C)'], bins=TEMP_BINS, labels=TEMP_COLORS, right=False)
+    return df.drop(columns='icon_code')
+
+
+def normalize_forecast(forecast, timezone_offset=None, city=None):
+    """Convert a Forecast record (or /forecast JSON) into a typed, one-row-per-slot DataFrame
+
+    Columns: dt (unix seconds), Datetime (city local time), Date, Time,
+    Temperature (°C), Humidity (%), Weather, Icon, Color and, when `city`
+    is given, City. Returns an empty frame when there is nothing usable.
+    """
+    import pandas as pd
+    forecast = _as_forecast(forecast)
+    if timezone_offset is None:
+        timezone_offset = forecast.timezone or 0
+
+    df = pd.DataFrame(_record_columns(forecast), columns=FORECAST_COLUMNS)
+    if df.empty:
+        return df
+
+    df = _finish_frame(df, timezone_offset)
+    if city is not None:
+        df['City'] = pd.Categorical([city] * len(df))
+    return df
+
+
+def normalize_forecasts(forecasts, local_time=False):
+    """Stack several cities' forecasts into one frame with a City column
+
+    `forecasts` maps city name to a Forecast record (or /forecast JSON). All
+    cities go through one vectorized pass. Datetime/Date/Time are UTC by
+    default so the curves of different cities line up; pass local_time=True
+    for each city's own clock.
+    """
+    import pandas as pd
+    columns = {name: [] for name in FORECAST_COLUMNS}
+    offsets = []
+    cities = []
+    for city, forecast in forecasts.items():
+        forecast = _as_forecast(forecast)
+        for name, values in _record_columns(forecast).items():
+            columns[name].extend(values)
+        cities.extend([city] * len(forecast))
+        offsets.extend([(forecast.timezone or 0) if local_time else 0] * len(forecast))
+
+    df = pd.DataFrame(columns, columns=FORECAST_COLUMNS)
+    if df.empty:
+        return df
+
+    df = _finish_frame(df, pd.Series(offsets, index=df.index, dtype='int64'))
+    df['City'] = pd.Categorical(cities, categories=list(forecasts))
+    return df
+
+
+def _group_mode(df, keys, column):
+    """Most frequent value of column per group (ties go to the smallest value, like Series.mode)"""
+    counts = df.groupby(keys + [column], observed=True, sort=False).size().reset_index(name='_count')
+    counts[column] = counts[column].astype(str)
+    counts = counts.sort_values(keys + ['_count', column], ascending=[True] * len(keys) + [False, True])
+    return counts.drop_duplicates(keys).set_index(keys)[column]
+
+
+def daily_summary(df):
+    """Per-day min/max/mean temperature, mean humidity and most common weather
+
+    Groups by City as well when the frame has that column.
+    """
+    keys = ['City', 'Date'] if 'City' in df.columns else ['Date']
+    grouped = df.groupby(keys, observed=True)
+
+    summary = grouped['Temperature (°C)'].agg(['min', 'max', 'mean'])
+    summary.columns = ['Min Temp', 'Max Temp', 'Avg Temp']
+    summary['Avg Humidity'] = grouped['Humidity (%)'].mean()
+    summary = summary.round(1)
+    summary['Weather'] = _group_mode(df, keys, 'Weather')
+    summary['Icon'] = _group_mode(df, keys, 'Icon')
+    return summary.reset_index()
+
+
+def update_daily_summary(previous, df, dates):
+    """Refresh a daily_summary() frame for the given dates only
+
+    `df` is the new forecast frame and `dates` the local dates a forecast
+    merge touched (ChangeSet.dates()). Days that are untouched keep their
+    previous rows, days that left the forecast are dropped.
+    """
+    import pandas as pd
+    dates = set(dates)
+    kept = previous[~previous['Date'].isin(dates) & previous['Date'].isin(df['Date'].unique())]
+    changed = df[df['Date'].isin(dates)]
+    if changed.empty:
+        return kept.reset_index(drop=True)
+    return pd.concat([kept, daily_summary(changed)], ignore_index=True).sort_values('Date', ignore_index=True)
@@ -0,0 +1,140 @@
+"""
+Per-city forecast timelines for the Weather App
+
+Every /forecast refresh returns all 40 three-hour slots again, although
+usually only a few of them changed. ForecastStore merges each new Forecast
+record into the city's timeline keyed by slot time (dt):
+
+    - slots that have already passed are dropped
+    - slots whose values changed are updated, new slots are appended
+    - a ChangeSet lists the added, updated and removed slot times
+
+When nothing changed the previous record is returned as-is (same object,
+same version), so every chart, summary and map built from it stays cached.
+Otherwise the merged record is versioned by its slot content and the
+ChangeSet tells consumers which days to recompute (see update_daily_summary
+in forecast.py).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+# Store configuration (overridable through environment variables)
+FORECAST_STORE_MAX_CITIES = int(os.getenv("FORECAST_STORE_MAX_CITIES", "5000"))  # timelines kept, least recently merged dropped first
+SLOT_SECONDS = 3 * 3600  # one /forecast slot
+
+
+class ChangeSet:
+    """What one merge changed in a city's timeline"""
+
+    __slots__ = ('added', 'updated', 'removed', 'previous', 'version')
+
+    def __init__(self, added=(), updated=(), removed=(), previous=None, version=None):
+        self.added = tuple(added)  # slot times (dt) that are new
+        self.updated = tuple(updated)  # slot times whose values changed
+        self.removed = tuple(removed)  # slot times that passed or disappeared
+        self.previous = previous  # the Forecast record this merge replaced, if any
+        self.version = version  # version of the merged record
+
+    def __bool__(self):
+        return bool(self.added or self.updated or self.removed)
+
+    def __repr__(self):
+        return f"ChangeSet(+{len(self.added)} ~{len(self.updated)} -{len(self.removed)})"
+
+    @property
+    def touched(self):
+        return self.added + self.updated + self.removed
+
+    def dates(self, timezone_offset=0):
+        """Local calendar dates ('YYYY-MM-DD') of every touched slot"""
+        return {
+            datetime.fromtimestamp(dt + timezone_offset, timezone.utc).strftime('%Y-%m-%d')
+            for dt in self.touched
+        }
+
+
+class ForecastStore:
+    """Latest merged Forecast and ChangeSet per city"""
+
+    def __init__(self, max_cities=FORECAST_STORE_MAX_CITIES):
+        self.max_cities = max_cities
+        self._timelines = OrderedDict()  # city key -> (Forecast, ChangeSet)
+        self._lock = threading.Lock()
+        self.merges = 0
+        self.unchanged = 0
+        self.slots_added = 0
+        self.slots_updated = 0
+        self.slots_removed = 0
+
+    def merge(self, forecast, now=None):
+        """Merge a freshly parsed Forecast into its city's timeline; returns (Forecast, ChangeSet)"""
+        now = time.time() if now is None else now
+        key = self._key(forecast)
+        current = [i for i, dt in enumerate(forecast.dt) if dt + SLOT_SECONDS > now]
+
+        with self._lock:
+            previous, _ = self._timelines.get(key, (None, None))
+            old = {slot[0]: slot[1:] for slot in previous.slots()} if previous is not None else {}
+            new = {forecast.dt[i]: (forecast.temp[i], forecast.humidity[i], forecast.description[i], forecast.icon_code[i])
+                   for i in current}
+
+            added = [dt for dt in new if dt not in old]
+            updated = [dt for dt in new if dt in old and new[dt] != old[dt]]
+            removed = [dt for dt in old if dt not in new]
+            self.merges += 1
+
+            if previous is not None and not (added or updated or removed) and self._same_city(previous, forecast):
+                self.unchanged += 1
+                changes = ChangeSet(previous=previous, version=previous.version)
+                self._timelines[key] = (previous, changes)
+                self._timelines.move_to_end(key)
+                return previous, changes
+
+            merged = forecast.select(current)
+            changes = ChangeSet(added, updated, removed, previous, merged.version)
+            self.slots_added += len(added)
+            self.slots_updated += len(updated)
+            self.slots_removed += len(removed)
+            self._timelines[key] = (merged, changes)
+            self._timelines.move_to_end(key)
+            while len(self._timelines) > self.max_cities:
+                self._timelines.popitem(last=False)
+            return merged, changes
+
+    def changes_for(self, forecast):
+        """The ChangeSet that produced this exact record, or None"""
+        with self._lock:
+            entry = self._timelines.get(self._key(forecast))
+        if entry is None or entry[1].version != forecast.version:
+            return None
+        return entry[1]
+
+    def stats(self):
+        """Return a snapshot of the merge counters"""
+        with self._lock:
+            return {
+                'cities': len(self._timelines),
+                'merges': self.merges,
+                'unchanged': self.unchanged,
+                'slots_added': self.slots_added,
+                'slots_updated': self.slots_updated,
+                'slots_removed': self.slots_removed
+            }
+
+    @staticmethod
+    def _key(forecast):
+        """Timelines are per city id, so different spellings of a name share one"""
+        if forecast.city_id is not None:
+            return forecast.city_id
+        return (forecast.name or '').lower()
+
+    @staticmethod
+    def _same_city(previous, forecast):
+        return previous.timezone == forecast.timezone and previous.name == forecast.name
+
+
+forecast_store = ForecastStore()
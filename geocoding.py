@@ -0,0 +1,114 @@
+"""
+Persistent geocoding index for the Weather App
+
+Maps free-text city queries to OpenWeatherMap coordinates and city ids so
+the weather endpoints can be queried by lat/lon instead of re-resolving the
+name on every call. The index is seeded for free from the `coord` block that
+every weather/forecast response already carries, and is kept in a small
+SQLite file that survives restarts and is shared by worker processes.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from sqlite_writer import connect
+from weather_cache import DATA_DIR, normalize_city
+
+GEOCODE_DB_PATH = os.getenv("GEOCODE_DB_PATH", os.path.join(DATA_DIR, "geocode.sqlite3"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    query TEXT PRIMARY KEY,
+    city_id INTEGER,
+    name TEXT,
+    country TEXT,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class GeocodeIndex:
+    """SQLite-backed query -> place index with an in-memory front"""
+
+    def __init__(self, path=GEOCODE_DB_PATH):
+        self.path = path
+        self._conn = None
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, city):
+        """Return {'city_id', 'name', 'country', 'lat', 'lon'} for a query, or None"""
+        query = normalize_city(city)
+        with self._lock:
+            if query in self._memo:
+                return self._memo[query]
+            try:
+                row = self._connection().execute(
+                    "SELECT city_id, name, country, lat, lon FROM places WHERE query = ?", (query,)
+                ).fetchone()
+            except sqlite3.Error:
+                return None  # A broken index only costs us name resolution
+            place = None
+            if row:
+                place = dict(zip(('city_id', 'name', 'country', 'lat', 'lon'), row))
+                self._memo[query] = place
+            return place
+
+    def remember(self, city, place):
+        """Store a resolved place under the (normalized) query that produced it"""
+        query = normalize_city(city)
+        with self._lock:
+            try:
+                conn = self._connection()
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO places (query, city_id, name, country, lat, lon, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (query, place.get('city_id'), place.get('name'), place.get('country'),
+                         place['lat'], place['lon'], time.time())
+                    )
+            except sqlite3.Error:
+                pass
+            self._memo[query] = place
+
+    def remember_response(self, city, data):
+        """Seed the index from a /weather or /forecast response"""
+        place = place_from_response(data)
+        if place and not self.lookup(city):
+            self.remember(city, place)
+
+    def _connection(self):
+        """Open the database lazily (caller holds the lock)"""
+        if self._conn is None:
+            self._conn = connect(self.path, _SCHEMA, timeout=5, check_same_thread=False)
+        return self._conn
+
+
+def place_from_response(data):
+    """Extract a place from a weather response (top-level coord) or forecast response (city block)"""
+    if not isinstance(data, dict):
+        return None
+    source = data.get('city') if 'city' in data else data
+    coord = (source or {}).get('coord')
+    if not coord or 'lat' not in coord or 'lon' not in coord:
+        return None
+    country = source.get('country') or data.get('sys', {}).get('country')
+    return {
+        'city_id': source.get('id'),
+        'name': source.get('name'),
+        'country': country,
+        'lat': coord['lat'],
+        'lon': coord['lon']
+    }
+
+
+def location_params(place):
+    """Query parameters that address a resolved place directly"""
+    return {'lat': place['lat'], 'lon': place['lon']}
+
+
+geocode_index = GeocodeIndex()
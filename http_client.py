@@ -0,0 +1,211 @@
+"""
+Shared HTTP client for all upstream calls made by the Weather App
+
+One requests.Session per process keeps connections alive in per-host pools,
+so repeat calls skip the TCP (and TLS) handshake. Every request gets a
+connect/read timeout, bounded retries with jittered backoff on 429/5xx, a
+circuit breaker per upstream host and latency bookkeeping.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Client configuration (overridable through environment variables)
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.25"))  # seconds
+BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "4"))  # seconds
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))  # connections kept alive per host
+BREAKER_THRESHOLD = int(os.getenv("HTTP_BREAKER_THRESHOLD", "5"))  # consecutive failures before opening
+BREAKER_COOLDOWN = float(os.getenv("HTTP_BREAKER_COOLDOWN", "30"))  # seconds before a trial request
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+LATENCY_SAMPLES = 500  # recent samples kept per host
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised when an upstream host is failing and calls are short-circuited"""
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open after a cooldown"""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        """Return True if a request may be sent right now"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_in_flight:
+                # Let exactly one trial request through
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """End a trial that finished without a verdict, so the next request may try again"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class LatencyStats:
+    """Per-host request counters and recent latency samples"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, seconds, ok):
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.samples.append(seconds)
+
+    def snapshot(self):
+        ordered = sorted(self.samples)
+
+        def percentile(p):
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'avg_ms': (self.total_seconds / self.requests * 1000) if self.requests else 0.0,
+            'p50_ms': percentile(0.50) * 1000,
+            'p95_ms': percentile(0.95) * 1000,
+            'max_ms': self.max_seconds * 1000
+        }
+
+
+def backoff_delay(attempt, response=None):
+    """Jittered exponential backoff, honouring a numeric Retry-After header"""
+    if response is not None:
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+class HTTPClient:
+    """Keep-alive HTTP client with timeouts, retries and per-host circuit breakers"""
+
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, max_retries=MAX_RETRIES):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._breakers = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        """Send a GET request and return the final response
+
+        Raises requests.RequestException (including CircuitOpenError) when the
+        host is unreachable; HTTP error statuses are left to raise_for_status().
+        """
+        host = urlsplit(url).netloc
+        breaker, stats = self._for_host(host)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{host} is temporarily unavailable (circuit open)")
+        try:
+            return self._attempts(url, params, timeout, breaker, stats)
+        finally:
+            breaker.release()  # Any other exception (or an interrupt) must not leave a half-open trial pending
+
+    def _attempts(self, url, params, timeout, breaker, stats):
+        """The request with its retries; records the outcome on breaker and stats"""
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                stats.record(time.perf_counter() - started, ok=False)
+                if attempt >= self.max_retries:
+                    breaker.record_failure()
+                    raise
+                stats.retries += 1
+                time.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            ok = response.status_code not in RETRY_STATUS_CODES
+            stats.record(time.perf_counter() - started, ok=ok)
+            if ok:
+                breaker.record_success()
+                return response
+            if attempt >= self.max_retries:
+                breaker.record_failure()
+                return response
+
+            stats.retries += 1
+            time.sleep(backoff_delay(attempt, response))
+            attempt += 1
+
+    def metrics(self):
+        """Return latency and breaker state for every host seen so far"""
+        with self._lock:
+            hosts = list(self._stats)
+        return {
+            host: dict(self._stats[host].snapshot(), circuit=self._breakers[host].state)
+            for host in hosts
+        }
+
+    def _for_host(self, host):
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker()
+                self._stats[host] = LatencyStats()
+            return self._breakers[host], self._stats[host]
+
+
+http_client = HTTPClient()
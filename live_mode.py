@@ -0,0 +1,77 @@
+"""
+Live mode bookkeeping for the Weather App
+
+Sessions in live mode rerun their weather views fragment every
+LIVE_REFRESH_INTERVAL seconds (st.fragment(run_every=...)), so Streamlit
+pushes the updated elements over the open websocket without a page reload
+or a full script rerun. A live run only reads the shared response cache;
+stale entries are handed to the background refresher, which refreshes each
+city once per TTL however many tabs are watching it.
+
+LiveWatchers bounds how many sessions may be live at once per process.
+Sessions that stop checking in (closed tabs) expire after a few intervals.
+"""
+
+import os
+import threading
+import time
+
+from tracing import tracer
+
+# Live mode configuration (overridable through environment variables)
+LIVE_REFRESH_INTERVAL = float(os.getenv("LIVE_REFRESH_INTERVAL", "60"))  # seconds between live updates
+LIVE_MAX_WATCHERS = int(os.getenv("LIVE_MAX_WATCHERS", "1000"))  # live sessions per process
+LIVE_WATCHER_TIMEOUT = 3 * LIVE_REFRESH_INTERVAL  # a session that missed this many seconds of updates has gone
+
+
+class LiveWatchers:
+    """Bounded registry of sessions in live mode"""
+
+    def __init__(self, max_watchers=LIVE_MAX_WATCHERS, timeout=LIVE_WATCHER_TIMEOUT):
+        self.max_watchers = max_watchers
+        self.timeout = timeout
+        self._watchers = {}  # session id -> (city, last_seen)
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.updates = 0
+
+    def touch(self, session_id, city):
+        """Register or refresh a live session; returns False when live mode is full"""
+        now = time.monotonic()
+        with self._lock:
+            if session_id not in self._watchers and len(self._watchers) >= self.max_watchers:
+                self._expire(now)
+                if len(self._watchers) >= self.max_watchers:
+                    self.rejected += 1
+                    return False
+            self._watchers[session_id] = (city, now)
+            return True
+
+    def leave(self, session_id):
+        with self._lock:
+            self._watchers.pop(session_id, None)
+
+    def record_update(self):
+        """Count a live run that found newer data"""
+        self.updates += 1
+
+    def stats(self):
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                'watchers': len(self._watchers),
+                'cities': len({city for city, _ in self._watchers.values()}),
+                'max_watchers': self.max_watchers,
+                'rejected': self.rejected,
+                'updates': self.updates
+            }
+
+    def _expire(self, now):
+        """Drop sessions that stopped checking in (caller holds the lock)"""
+        for session_id, (_, last_seen) in list(self._watchers.items()):
+            if now - last_seen > self.timeout:
+                del self._watchers[session_id]
+
+
+live_watchers = LiveWatchers()
+tracer.register_stats("live_watchers", live_watchers.stats)
@@ -0,0 +1,269 @@
+"""
+Shared weather news feed for the Weather App
+
+A single background worker fetches weather news from NewsAPI on a schedule
+and publishes it as a versioned snapshot that every session reads without
+waiting on the network. When no NewsAPI key is configured (or the call
+fails) the curated fallback stories are served instead.
+
+NewsAPI snapshots are also kept in the disk cache tier, so a restarted
+process serves the last stories and waits out their remaining lifetime
+instead of calling NewsAPI on startup.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from async_client import blocking_get
+from disk_cache import disk_cache
+from rate_limiter import news_limiter, PRIORITY_NEWS
+from tracing import tracer
+
+# Weather News Configuration
+WEATHER_NEWS_CACHE_DURATION = 3600  # 1 hour in seconds
+WEATHER_NEWS_RETRY_DELAY = 300  # retry a failed refresh after 5 minutes
+NEWS_DISK_KEY = ('news',)
+NEWS_API_URL = os.getenv("NEWS_API_URL", "https://newsapi.org/v2/everything")
+NEWS_QUERY = '"weather forecast" OR "severe weather" OR "climate change" OR "storm warning" OR flooding OR hurricane OR tornado OR wildfire OR heatwave OR blizzard OR "extreme weather" OR "weather alert" -entertainment -health -sports -finance'
+
+# Used to filter out unrelated articles by checking title/description
+NEWS_KEYWORDS = [
+    'weather', 'forecast', 'storm', 'hurricane', 'tornado', 'flood', 'wildfire', 'heatwave', 'blizzard', 'climate', 'rain', 'snow', 'drought', 'typhoon', 'cyclone', 'lightning', 'thunder', 'wind', 'temperature', 'cold', 'hot', 'heat', 'freezing', 'frost', 'hail', 'meteorological', 'atmosphere', 'precipitation', 'severe weather', 'storm warning', 'flooding', 'extreme', 'alert', 'warning'
+]
+
+
+def get_news_api_key():
+    """NewsAPI key from the environment (optional)"""
+    return os.getenv("NEWS_API_KEY")
+
+
+@tracer.timed("upstream.news")
+def fetch_weather_news(news_api_key):
+    """Fetch the top 3 weather stories from NewsAPI
+
+    Returns a list of news dicts (empty if nothing usable came back) and
+    raises requests.RequestException / RuntimeError on failure.
+    """
+    params = {
+        'q': NEWS_QUERY,
+        'language': 'en',
+        'sortBy': 'publishedAt',
+        'pageSize': 20,
+        'apiKey': news_api_key
+    }
+
+    response = blocking_get(NEWS_API_URL, params=params)
+    if response.status_code != 200:
+        raise RuntimeError(f"NewsAPI returned status code: {response.status_code}")
+
+    articles = response.json().get('articles', [])
+
+    filtered_articles = []
+    for article in articles:
+        title = article.get('title', '') or ''
+        description = article.get('description', '') or ''
+        text = (title + ' ' + description).lower()
+        if any(kw in text for kw in NEWS_KEYWORDS):
+            filtered_articles.append(article)
+
+    # If we don't have enough filtered articles, use all articles (they should be weather-related from the query)
+    if len(filtered_articles) < 3:
+        filtered_articles = articles[:10]  # Take first 10 articles
+
+    weather_news = []
+    for article in filtered_articles[:3]:  # Get top 3 filtered articles
+        # Use description instead of content since content is truncated by NewsAPI
+        content = article.get('content', '') or ''
+        description = article.get('description', '') or ''
+
+        # If content is truncated, use description instead
+        if content and '[+' in content:
+            display_content = description
+        else:
+            display_content = content if content else description
+
+        weather_news.append({
+            'title': article.get('title', 'Weather Update') or 'Weather Update',
+            'description': article.get('description', 'Weather-related news') or 'Weather-related news',
+            'content': display_content or 'No content available',
+            'url': article.get('url', '#') or '#',
+            'source': article.get('source', {}).get('name', 'News Source') or 'News Source',
+            'published_at': article.get('publishedAt', '') or '',
+            'icon': get_weather_news_icon(article.get('title', '') or '')
+        })
+
+    return weather_news
+
+
+def get_weather_news_icon(title):
+    """Get appropriate weather icon based on news title"""
+    if not title:
+        return '🌤️'
+
+    title_lower = title.lower()
+
+    if any(word in title_lower for word in ['tornado', 'cyclone', 'hurricane']):
+        return '🌪️'
+    elif any(word in title_lower for word in ['flood', 'rain', 'monsoon']):
+        return '🌧️'
+    elif any(word in title_lower for word in ['fire', 'wildfire', 'blaze']):
+        return '🔥'
+    elif any(word in title_lower for word in ['snow', 'blizzard', 'winter']):
+        return '❄️'
+    elif any(word in title_lower for word in ['heat', 'drought', 'hot']):
+        return '🌡️'
+    elif any(word in title_lower for word in ['storm', 'thunder']):
+        return '⛈️'
+    else:
+        return '🌤️'
+
+
+def get_fallback_weather_news():
+    """Provide curated fallback weather news when API is unavailable"""
+    current_date = datetime.now().strftime("%Y-%m-%d")
+
+    return [
+        {
+            'title': 'Global Climate Patterns Shift',
+            'description': 'Scientists observe unusual weather patterns across multiple continents',
+            'content': 'Recent climate data shows significant shifts in global weather patterns, affecting regions from the Arctic to the tropics. Researchers are monitoring these changes closely and studying their potential impact on global weather systems.',
+            'url': 'https://www.climate.gov/news-features',
+            'source': 'Climate.gov',
+            'published_at': current_date,
+            'icon': '🌍'
+        },
+        {
+            'title': 'Extreme Weather Events Increase',
+            'description': 'Frequency of severe storms and natural disasters rises globally',
+            'content': 'Meteorologists report an increase in extreme weather events worldwide, including hurricanes, floods, and heatwaves affecting millions of people. Climate scientists are analyzing the correlation between rising global temperatures and weather intensity.',
+            'url': 'https://www.wmo.int/news',
+            'source': 'World Meteorological Organization',
+            'published_at': current_date,
+            'icon': '⛈️'
+        },
+        {
+            'title': 'Renewable Energy Weather Impact',
+            'description': 'Weather conditions significantly affect renewable energy production',
+            'content': 'Solar and wind energy production varies dramatically with weather conditions, highlighting the importance of accurate weather forecasting for energy planning. Advanced weather prediction models are helping optimize renewable energy grid management.',
+            'url': 'https://www.energy.gov/weather',
+            'source': 'Department of Energy',
+            'published_at': current_date,
+            'icon': '☀️'
+        }
+    ]
+
+
+class NewsFeed:
+    """Versioned, process-wide news snapshot kept fresh by one worker thread"""
+
+    def __init__(self, interval=WEATHER_NEWS_CACHE_DURATION):
+        self.interval = interval
+        self._snapshot = {
+            'news': get_fallback_weather_news(),
+            'timestamp': time.time(),
+            'version': 0,
+            'source': 'fallback',
+            'error': None
+        }
+        self._refreshing = False
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def snapshot(self):
+        """Return the current news snapshot without blocking
+
+        The dict holds 'news', 'timestamp', 'version', 'source' ('newsapi' or
+        'fallback') and 'error' (last refresh problem, or None).
+        """
+        self._ensure_started()
+        return self._snapshot
+
+    @property
+    def refreshing(self):
+        return self._refreshing
+
+    def refresh(self):
+        """Request a refresh now; joins the one already running if there is one"""
+        self._ensure_started()
+        with self._lock:
+            if not self._refreshing:
+                self._refreshing = True
+                self._wake.set()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                first_delay = self._restore()
+                self._refreshing = not first_delay  # Without a saved snapshot the first fetch starts immediately
+                self._thread = threading.Thread(target=self._run, args=(first_delay,), name="weather-news", daemon=True)
+                self._thread.start()
+
+    def _restore(self):
+        """Publish the snapshot a previous run saved to disk; returns seconds until it needs refreshing"""
+        entry = disk_cache.get(NEWS_DISK_KEY) if get_news_api_key() else None
+        if entry is None:
+            return 0
+        payload, expires_at = entry
+        try:
+            saved = json.loads(payload)
+            self._publish(saved['news'], 'newsapi', None, saved['timestamp'])
+        except (ValueError, KeyError, TypeError):
+            return 0
+        return max(0.0, expires_at - time.time())
+
+    def _run(self, first_delay=0):
+        if first_delay:
+            self._wake.wait(first_delay)
+            self._wake.clear()
+        while True:
+            with self._lock:
+                self._refreshing = True
+            delay = self.interval if self._update() else WEATHER_NEWS_RETRY_DELAY
+            with self._lock:
+                self._refreshing = False
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def _update(self):
+        """Fetch news once and publish a new snapshot; returns True on success"""
+        news_api_key = get_news_api_key()
+        if not news_api_key:
+            self._publish(get_fallback_weather_news(), 'fallback', None)
+            return True
+        if not news_limiter.acquire(PRIORITY_NEWS):
+            return False  # Keep serving what we have
+
+        try:
+            weather_news = fetch_weather_news(news_api_key)
+        except Exception as e:
+            self._publish(self._snapshot['news'], self._snapshot['source'], f"Could not fetch real-time weather news: {str(e)}")
+            return False
+
+        if weather_news:
+            self._publish(weather_news, 'newsapi', None)
+            disk_cache.put(NEWS_DISK_KEY, json.dumps(self._snapshot, ensure_ascii=False).encode(), self.interval)
+        else:
+            self._publish(get_fallback_weather_news(), 'fallback', None)
+        return True
+
+    def _publish(self, news, source, error, timestamp=None):
+        # Snapshots are replaced, never mutated, so readers need no lock
+        if timestamp is None:
+            timestamp = time.time() if error is None else self._snapshot['timestamp']
+        self._snapshot = {
+            'news': news,
+            'timestamp': timestamp,
+            'version': self._snapshot['version'] + 1,
+            'source': source,
+            'error': error
+        }
+
+
+news_feed = NewsFeed()
+tracer.register_stats("news_limiter", news_limiter.stats)
@@ -0,0 +1,171 @@
+"""
+Local observation store for the Weather App
+
+Every weather and forecast payload fetched from OpenWeatherMap is appended to
+a SQLite database (WAL mode) so the app can chart history without calling
+the API again. Rows are keyed by OpenWeatherMap city id and timestamp;
+writes are batched on a background thread so fetches never wait on disk.
+
+Queries:
+    last_hours(city_id, hours)  -> observations for one city, oldest first
+    at_time(timestamp)          -> the latest observation of every city at that time
+"""
+
+import os
+import sqlite3
+import time
+
+from sqlite_writer import BatchWriter, ThreadConnections
+from weather_cache import DATA_DIR
+
+OBSERVATION_DB_PATH = os.getenv("OBSERVATION_DB_PATH", os.path.join(DATA_DIR, "observations.sqlite3"))
+OBSERVATION_STORE_ENABLED = os.getenv("OBSERVATION_STORE_ENABLED", "1") != "0"
+WRITE_BATCH_SIZE = 500
+WRITE_FLUSH_INTERVAL = 0.5  # seconds
+
+OBSERVATION_COLUMNS = [
+    'city_id', 'city', 'observed_at', 'fetched_at', 'temp', 'feels_like', 'humidity',
+    'pressure', 'wind_speed', 'clouds', 'weather', 'icon'
+]
+FORECAST_COLUMNS = ['city_id', 'fetched_at', 'dt', 'temp', 'humidity', 'weather', 'icon']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    city_id INTEGER NOT NULL,
+    city TEXT,
+    observed_at INTEGER NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    temp REAL,
+    feels_like REAL,
+    humidity INTEGER,
+    pressure INTEGER,
+    wind_speed REAL,
+    clouds INTEGER,
+    weather TEXT,
+    icon TEXT,
+    PRIMARY KEY (city_id, observed_at)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS observations_by_time ON observations (observed_at);
+CREATE TABLE IF NOT EXISTS forecast_snapshots (
+    city_id INTEGER NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    dt INTEGER NOT NULL,
+    temp REAL,
+    humidity INTEGER,
+    weather TEXT,
+    icon TEXT,
+    PRIMARY KEY (city_id, fetched_at, dt)
+) WITHOUT ROWID;
+"""
+
+
+def observation_row(city, weather_data, fetched_at=None):
+    """Flatten a /weather response into an observations row (None if unusable)"""
+    try:
+        return (
+            weather_data['id'], city, weather_data['dt'], int(fetched_at or time.time()),
+            weather_data['main']['temp'], weather_data['main'].get('feels_like'),
+            weather_data['main'].get('humidity'), weather_data['main'].get('pressure'),
+            weather_data.get('wind', {}).get('speed'), weather_data.get('clouds', {}).get('all'),
+            weather_data['weather'][0]['description'], weather_data['weather'][0]['icon']
+        )
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def forecast_rows(forecast_data, fetched_at=None):
+    """Flatten a /forecast response into forecast_snapshots rows"""
+    city_id = (forecast_data or {}).get('city', {}).get('id')
+    if city_id is None:
+        return []
+    fetched_at = int(fetched_at or time.time())
+    rows = []
+    for item in forecast_data.get('list', []):
+        try:
+            rows.append((
+                city_id, fetched_at, item['dt'], item['main']['temp'], item['main'].get('humidity'),
+                item['weather'][0]['description'], item['weather'][0]['icon']
+            ))
+        except (KeyError, IndexError, TypeError):
+            continue
+    return rows
+
+
+class ObservationStore:
+    """Append-only SQLite store with a batching background writer"""
+
+    def __init__(self, path=OBSERVATION_DB_PATH, enabled=OBSERVATION_STORE_ENABLED):
+        self.path = path
+        self.enabled = enabled
+        self._connections = ThreadConnections(path, _SCHEMA)
+        self._writer = BatchWriter(
+            self._write, "observation-writer", WRITE_BATCH_SIZE, WRITE_FLUSH_INTERVAL,
+            weight=lambda item: len(item[1])  # batches are sized in rows
+        )
+        self.written = 0
+        self.errors = 0
+
+    def record(self, endpoint, city, data):
+        """Queue a fetched payload for storage (never blocks on disk)"""
+        if not self.enabled:
+            return
+        if endpoint == 'weather':
+            row = observation_row(city, data)
+            if row:
+                self._writer.put(('observations', [row]))
+        elif endpoint == 'forecast':
+            rows = forecast_rows(data)
+            if rows:
+                self._writer.put(('forecast_snapshots', rows))
+
+    def ingest(self, table, rows):
+        """Write rows synchronously in one transaction (used by the writer and bulk loads)"""
+        columns = OBSERVATION_COLUMNS if table == 'observations' else FORECAST_COLUMNS
+        placeholders = ', '.join('?' * len(columns))
+        conn = self._connections.get()
+        with conn:
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows
+            )
+        self.written += len(rows)
+
+    def last_hours(self, city_id, hours=24, now=None):
+        """Observations for one city over the last `hours`, oldest first"""
+        since = int((now or time.time()) - hours * 3600)
+        cursor = self._connections.get().execute(
+            f"SELECT {', '.join(OBSERVATION_COLUMNS)} FROM observations "
+            "WHERE city_id = ? AND observed_at >= ? ORDER BY observed_at",
+            (city_id, since)
+        )
+        return [dict(zip(OBSERVATION_COLUMNS, row)) for row in cursor]
+
+    def at_time(self, timestamp, tolerance=3600):
+        """Latest observation of every city taken within `tolerance` seconds before timestamp"""
+        columns = ', '.join(f"o.{column}" for column in OBSERVATION_COLUMNS)
+        cursor = self._connections.get().execute(
+            f"SELECT {columns} FROM observations o JOIN ("
+            "  SELECT city_id, MAX(observed_at) AS observed_at FROM observations"
+            "  WHERE observed_at BETWEEN ? AND ? GROUP BY city_id"
+            ") latest ON o.city_id = latest.city_id AND o.observed_at = latest.observed_at",
+            (int(timestamp - tolerance), int(timestamp))
+        )
+        return [dict(zip(OBSERVATION_COLUMNS, row)) for row in cursor]
+
+    def flush(self):
+        """Wait until everything queued so far has been written"""
+        self._writer.flush()
+
+    def _write(self, items):
+        """Store one batch of (table, rows) from the writer thread, one transaction per table"""
+        batches = {'observations': [], 'forecast_snapshots': []}
+        for table, rows in items:
+            batches[table].extend(rows)
+        try:
+            for table, rows in batches.items():
+                if rows:
+                    self.ingest(table, rows)
+        except sqlite3.Error:
+            self.errors += 1  # Losing history must never break fetching
+
+
+observation_store = ObservationStore()
@@ -0,0 +1,184 @@
+"""
+Process-wide rate limiting for upstream API keys
+
+Every session shares the same OpenWeatherMap key, so calls are metered
+through a token bucket sized to the API plan. Callers pass a priority:
+lower-priority work must leave part of the bucket untouched, which keeps
+interactive lookups flowing while background refreshes and news back off.
+
+By default the bucket lives in memory. Set RATE_LIMIT_DB to a file path to
+keep it in SQLite instead, so several Streamlit worker processes on one host
+draw from the same budget.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+
+from sqlite_writer import connect
+
+# Limiter configuration (overridable through environment variables)
+OWM_CALLS_PER_MINUTE = int(os.getenv("OWM_CALLS_PER_MINUTE", "60"))  # free plan limit
+NEWS_CALLS_PER_MINUTE = int(os.getenv("NEWS_CALLS_PER_MINUTE", "5"))
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB", "")  # empty = per-process bucket
+
+_SCHEMA = "CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+
+# Priority classes, most important first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_NEWS = 2
+
+# Fraction of the bucket each class has to leave for the classes above it
+PRIORITY_RESERVE = {
+    PRIORITY_INTERACTIVE: 0.0,
+    PRIORITY_BACKGROUND: 0.25,
+    PRIORITY_NEWS: 0.5
+}
+
+
+class RateLimitExceeded(requests.RequestException):
+    """Raised when the request budget for an upstream API is used up"""
+
+
+class TokenBucket:
+    """In-memory token bucket refilled continuously at calls_per_minute"""
+
+    blocking = False  # whether _try_take() may wait on I/O
+
+    def __init__(self, name, calls_per_minute):
+        self.name = name
+        self.capacity = float(calls_per_minute)
+        self.rate = calls_per_minute / 60.0  # tokens per second
+        self.granted = 0
+        self.denied = 0
+        self._tokens = self.capacity
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self, priority=PRIORITY_INTERACTIVE, wait=0.0):
+        """Take one token, waiting up to `wait` seconds; return True on success"""
+        deadline = time.monotonic() + wait
+        while True:
+            retry_in = self._try_take(priority)
+            if retry_in is None:
+                self.granted += 1
+                return True
+            if time.monotonic() + retry_in > deadline:
+                self.denied += 1
+                return False
+            time.sleep(retry_in)
+
+    async def acquire_async(self, priority=PRIORITY_INTERACTIVE, wait=0.0):
+        """acquire() for coroutines: waits on the event loop instead of sleeping the thread"""
+        deadline = time.monotonic() + wait
+        while True:
+            if self.blocking:
+                retry_in = await asyncio.to_thread(self._try_take, priority)
+            else:
+                retry_in = self._try_take(priority)
+            if retry_in is None:
+                self.granted += 1
+                return True
+            if time.monotonic() + retry_in > deadline:
+                self.denied += 1
+                return False
+            await asyncio.sleep(retry_in)
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'calls_per_minute': self.capacity,
+            'tokens': round(self._peek(), 2),
+            'granted': self.granted,
+            'denied': self.denied
+        }
+
+    def _try_take(self, priority):
+        """Return None if a token was taken, else seconds until one could be"""
+        with self._lock:
+            self._tokens, self._updated, retry_in = _take(
+                self._tokens, self._updated, self.capacity, self.rate, priority
+            )
+            return retry_in
+
+    def _peek(self):
+        with self._lock:
+            return min(self.capacity, self._tokens + (time.time() - self._updated) * self.rate)
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """Token bucket whose state is shared between processes through SQLite"""
+
+    blocking = True  # BEGIN IMMEDIATE may wait up to the busy timeout
+
+    def __init__(self, name, calls_per_minute, path):
+        super().__init__(name, calls_per_minute)
+        self.path = path
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = connect(self.path, _SCHEMA, timeout=5, isolation_level=None, check_same_thread=False)
+        return self._conn
+
+    def _try_take(self, priority):
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute("BEGIN IMMEDIATE")  # Serialize with other processes
+                try:
+                    row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (self.name,)).fetchone()
+                    tokens, updated = row if row else (self.capacity, time.time())
+                    tokens, updated, retry_in = _take(tokens, updated, self.capacity, self.rate, priority)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                        (self.name, tokens, updated)
+                    )
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error:
+                # Fall back to this process's own bucket rather than blocking every call
+                self._tokens, self._updated, retry_in = _take(
+                    self._tokens, self._updated, self.capacity, self.rate, priority
+                )
+            return retry_in
+
+    def _peek(self):
+        with self._lock:
+            try:
+                row = self._connection().execute(
+                    "SELECT tokens, updated FROM buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+            except sqlite3.Error:
+                row = None
+            if not row:
+                return self.capacity
+            return min(self.capacity, row[0] + (time.time() - row[1]) * self.rate)
+
+
+def _take(tokens, updated, capacity, rate, priority):
+    """Refill and try to take one token; returns (tokens, updated, retry_in)"""
+    now = time.time()
+    tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+    floor = capacity * PRIORITY_RESERVE.get(priority, 0.0)
+    if tokens - 1.0 >= floor:
+        return tokens - 1.0, now, None
+    return tokens, now, (floor + 1.0 - tokens) / rate
+
+
+def make_bucket(name, calls_per_minute, path=RATE_LIMIT_DB):
+    """Create a shared SQLite bucket when a path is configured, else an in-memory one"""
+    if path:
+        return SQLiteTokenBucket(name, calls_per_minute, path)
+    return TokenBucket(name, calls_per_minute)
+
+
+owm_limiter = make_bucket("openweathermap", OWM_CALLS_PER_MINUTE)
+news_limiter = make_bucket("newsapi", NEWS_CALLS_PER_MINUTE)
@@ -0,0 +1,215 @@
+"""
+Compact weather records for the Weather App
+
+OpenWeatherMap responses are parsed once, right after they are fetched, into
+small immutable records holding only the fields the app reads. The records
+are what the shared cache stores and what sessions keep in st.session_state,
+so every session references the same few hundred bytes instead of its own
+copy of the raw JSON.
+
+    CurrentWeather  one /weather response (__slots__ attributes)
+    Forecast        one /forecast response, column-oriented: each field is
+                    an array (numbers) or tuple (interned strings) with one
+                    value per 3-hour slot
+
+Every record carries `version`, a content hash of the payload it came from,
+which the render cache uses to key charts and maps.
+"""
+
+import hashlib
+import json
+import sys
+from array import array
+
+
+def payload_hash(data):
+    """Content hash of a raw JSON payload (used when the response bytes are not at hand)"""
+    return hashlib.sha1(json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+class _Record:
+    """Immutable __slots__ record; subclasses list their fields in __slots__"""
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        # Pickling/copying would otherwise go through the blocked __setattr__
+        return _rebuild, (type(self), tuple(getattr(self, name) for name in self.__slots__))
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _rebuild(cls, values):
+    return cls(**dict(zip(cls.__slots__, values)))
+
+
+class CurrentWeather(_Record):
+    """Current conditions for one city"""
+
+    __slots__ = (
+        'city_id', 'name', 'country', 'lat', 'lon', 'observed_at', 'timezone',
+        'temp', 'feels_like', 'humidity', 'pressure', 'wind_speed', 'clouds', 'visibility',
+        'rain_1h', 'description', 'icon_code', 'sunrise', 'sunset', 'version'
+    )
+
+    def __repr__(self):
+        return f"CurrentWeather({self.name!r}, {self.temp}°C, {self.description!r})"
+
+    @classmethod
+    def from_json(cls, data, version=None):
+        """Parse a /weather response; raises ValueError if it lacks the essentials"""
+        try:
+            main = data['main']
+            weather = data['weather'][0]
+            coord = data['coord']
+            sys_block = data.get('sys', {})
+            return cls(
+                city_id=data.get('id'),
+                name=data.get('name'),
+                country=sys_block.get('country'),
+                lat=coord['lat'],
+                lon=coord['lon'],
+                observed_at=data.get('dt'),
+                timezone=data.get('timezone', 0),
+                temp=main['temp'],
+                feels_like=main.get('feels_like', main['temp']),
+                humidity=main.get('humidity'),
+                pressure=main.get('pressure'),
+                wind_speed=data.get('wind', {}).get('speed'),
+                clouds=data.get('clouds', {}).get('all'),
+                visibility=data.get('visibility'),
+                rain_1h=data.get('rain', {}).get('1h', 0),
+                description=sys.intern(weather['description']),
+                icon_code=sys.intern(weather['icon']),
+                sunrise=sys_block.get('sunrise'),
+                sunset=sys_block.get('sunset'),
+                version=version or payload_hash(data)
+            )
+        except (KeyError, IndexError, TypeError) as e:
+            raise ValueError(f"Unexpected /weather response (missing {e})") from None
+
+    @property
+    def nbytes(self):
+        """Approximate memory footprint in bytes"""
+        return sys.getsizeof(self) + sum(sys.getsizeof(getattr(self, name)) for name in self.__slots__)
+
+
+class Forecast(_Record):
+    """3-hour forecast slots for one city, stored as columns"""
+
+    __slots__ = (
+        'city_id', 'name', 'country', 'lat', 'lon', 'timezone',
+        'dt', 'temp', 'humidity', 'description', 'icon_code', 'version'
+    )
+
+    def __len__(self):
+        return len(self.dt)
+
+    def __repr__(self):
+        return f"Forecast({self.name!r}, {len(self)} slots)"
+
+    @classmethod
+    def from_json(cls, data, version=None):
+        """Parse a /forecast response, skipping malformed slots"""
+        dt, temp, humidity, description, icon_code = array('q'), array('d'), array('d'), [], []
+        for item in (data or {}).get('list', []):
+            try:
+                weather = item['weather'][0]
+                main = item['main']
+                row = (int(item['dt']), float(main['temp']), float(main['humidity']),
+                       sys.intern(weather['description']), sys.intern(weather['icon']))
+            except (KeyError, IndexError, TypeError, ValueError):
+                continue  # Skip invalid data points
+            dt.append(row[0])
+            temp.append(row[1])
+            humidity.append(row[2])
+            description.append(row[3])
+            icon_code.append(row[4])
+
+        city = (data or {}).get('city', {})
+        coord = city.get('coord', {})
+        return cls(
+            city_id=city.get('id'),
+            name=city.get('name'),
+            country=city.get('country'),
+            lat=coord.get('lat'),
+            lon=coord.get('lon'),
+            timezone=city.get('timezone', 0),
+            dt=dt,
+            temp=temp,
+            humidity=humidity,
+            description=tuple(description),
+            icon_code=tuple(icon_code),
+            version=version or payload_hash(data or {})
+        )
+
+    def slots(self):
+        """(dt, temp, humidity, description, icon_code) per slot"""
+        return zip(self.dt, self.temp, self.humidity, self.description, self.icon_code)
+
+    def select(self, indexes):
+        """A Forecast holding only the slots at indexes, versioned by its content"""
+        indexes = list(indexes)
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(
+            dt=array('q', (self.dt[i] for i in indexes)),
+            temp=array('d', (self.temp[i] for i in indexes)),
+            humidity=array('d', (self.humidity[i] for i in indexes)),
+            description=tuple(self.description[i] for i in indexes),
+            icon_code=tuple(self.icon_code[i] for i in indexes)
+        )
+        fields['version'] = slots_version(fields)
+        return Forecast(**fields)
+
+    def head(self, n):
+        """The first n slots (see select())"""
+        return self.select(range(min(n, len(self))))
+
+    def to_dict(self):
+        fields = super().to_dict()
+        for column in ('dt', 'temp', 'humidity', 'description', 'icon_code'):
+            fields[column] = list(fields[column])
+        return fields
+
+    @property
+    def nbytes(self):
+        """Approximate memory footprint in bytes (interned strings are shared, so counted once)"""
+        shared = set(self.description) | set(self.icon_code)
+        return (
+            sys.getsizeof(self)
+            + sum(sys.getsizeof(getattr(self, name)) for name in self.__slots__)
+            + sum(sys.getsizeof(value) for value in shared)
+        )
+
+
+def slots_version(fields):
+    """Content hash of a forecast's slots (and the city they belong to)
+
+    Unlike the response hash this ignores everything the app does not keep,
+    so a refresh that changes no slot produces the same version.
+    """
+    digest = hashlib.sha1(f"{fields['city_id']}|{fields['timezone']}|".encode('utf-8'))
+    for column in ('dt', 'temp', 'humidity'):
+        digest.update(fields[column].tobytes())
+    digest.update('\x1f'.join(fields['description'] + fields['icon_code']).encode('utf-8'))
+    return digest.hexdigest()
+
+
+# Parser per OpenWeatherMap endpoint
+PARSERS = {
+    'weather': CurrentWeather.from_json,
+    'forecast': Forecast.from_json
+}
+
+
+def parse(endpoint, data, version=None):
+    """Parse a raw response from endpoint into its record"""
+    return PARSERS[endpoint](data, version)
@@ -0,0 +1,160 @@
+"""
+Background refresher for popular cities (stale-while-revalidate)
+
+Tracks which cities are requested most, and a single daemon thread
+re-fetches their current weather and forecast shortly before the cached
+copies expire. Requests that land on an expired entry are served the
+stale copy immediately and the refresh is queued here instead of blocking
+the page. Upstream calls made by the thread are capped per minute so the
+refresher can never eat the whole API plan.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from weather_cache import normalize_city
+
+# Refresher configuration (overridable through environment variables)
+HOT_CITIES_COUNT = int(os.getenv("HOT_CITIES_COUNT", "20"))  # N most-requested cities kept warm
+REFRESH_BUDGET_PER_MIN = int(os.getenv("REFRESH_BUDGET_PER_MIN", "30"))  # upstream calls per minute
+REFRESH_LEAD = float(os.getenv("REFRESH_LEAD", "60"))  # refresh this many seconds before expiry
+REFRESH_INTERVAL = float(os.getenv("REFRESH_INTERVAL", "15"))  # seconds between scans
+HOTNESS_HALF_LIFE = 3600  # request counts halve every hour so yesterday's news cools down
+HOT_MIN_SCORE = 0.5  # below this a city is no longer hot (one request, one half-life ago)
+
+
+class HotCityTracker:
+    """Decaying request counter per city (spellings that share a cache key count as one)"""
+
+    def __init__(self, half_life=HOTNESS_HALF_LIFE, min_score=HOT_MIN_SCORE):
+        self.half_life = half_life
+        self.min_score = min_score
+        self._scores = {}  # normalized city -> (score, last_seen, city, api_key)
+        self._lock = threading.Lock()
+
+    def record(self, city, api_key):
+        now = time.time()
+        name = normalize_city(city)
+        with self._lock:
+            score, last_seen, _, _ = self._scores.get(name, (0.0, now, city, api_key))
+            decay = 0.5 ** ((now - last_seen) / self.half_life)
+            self._scores[name] = (score * decay + 1.0, now, city, api_key)
+
+    def top(self, n):
+        """Return the n hottest (city, api_key) pairs, leaving out cities that cooled below min_score"""
+        now = time.time()
+        with self._lock:
+            ranked = sorted(
+                ((score * 0.5 ** ((now - last_seen) / self.half_life), name)
+                 for name, (score, last_seen, _, _) in self._scores.items()),
+                reverse=True
+            )
+            hot = [name for score, name in ranked if score >= self.min_score]
+            # Forget cities that went cold or fell far out of the running
+            for _, name in ranked[len(hot):]:
+                del self._scores[name]
+            for name in hot[n * 5:]:
+                del self._scores[name]
+            return [self._scores[name][2:] for name in hot[:n]]
+
+
+class BackgroundRefresher:
+    """Keeps hot cache entries warm from a single daemon thread
+
+    refresh(endpoint, city, api_key) performs one forced upstream fetch and
+    expires_in(endpoint, city) reports the seconds left on a cached entry
+    (None when it is not cached).
+    """
+
+    def __init__(self, refresh, expires_in, endpoints, hot_count=HOT_CITIES_COUNT,
+                 budget_per_min=REFRESH_BUDGET_PER_MIN, lead=REFRESH_LEAD, interval=REFRESH_INTERVAL):
+        self.refresh = refresh
+        self.expires_in = expires_in
+        self.endpoints = endpoints
+        self.hot_count = hot_count
+        self.budget_per_min = budget_per_min
+        self.lead = lead
+        self.interval = interval
+        self.tracker = HotCityTracker()
+        self._pending = {}  # (endpoint, normalized city) -> (city, api_key), refreshes requested by stale reads
+        self._spent = deque()  # timestamps of upstream calls in the last minute
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.refreshes = 0
+        self.failures = 0
+        self.skipped = 0
+
+    def record(self, city, api_key):
+        """Count a request for city so it can become hot"""
+        self.tracker.record(city, api_key)
+        self._ensure_started()
+
+    def schedule(self, endpoint, city, api_key):
+        """Ask for an out-of-band refresh (used when a stale entry was served)"""
+        with self._lock:
+            self._pending[(endpoint, normalize_city(city))] = (city, api_key)
+        self._ensure_started()
+        self._wake.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'refreshes': self.refreshes,
+                'failures': self.failures,
+                'skipped_over_budget': self.skipped,
+                'pending': len(self._pending),
+                'calls_last_minute': len(self._spent)
+            }
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="weather-refresher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self._refresh_due()
+            except Exception:
+                self.failures += 1  # Never let the refresher thread die
+
+    def _refresh_due(self):
+        """Refresh stale-served entries first, then hot entries close to expiry"""
+        with self._lock:
+            jobs = dict(self._pending)
+            self._pending.clear()
+
+        for city, api_key in self.tracker.top(self.hot_count):
+            for endpoint in self.endpoints:
+                remaining = self.expires_in(endpoint, city)
+                if remaining is not None and remaining < self.lead:
+                    jobs.setdefault((endpoint, normalize_city(city)), (city, api_key))
+
+        for (endpoint, _), (city, api_key) in jobs.items():
+            if not self._take_budget():
+                self.skipped += 1
+                continue
+            try:
+                self.refresh(endpoint, city, api_key)
+                self.refreshes += 1
+            except Exception:
+                self.failures += 1
+
+    def _take_budget(self):
+        """Consume one call from the per-minute budget if any is left"""
+        now = time.monotonic()
+        with self._lock:
+            while self._spent and now - self._spent[0] >= 60:
+                self._spent.popleft()
+            if len(self._spent) >= self.budget_per_min:
+                return False
+            self._spent.append(now)
+            return True
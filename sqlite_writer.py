@@ -0,0 +1,104 @@
+"""
+SQLite helpers for the Weather App's on-disk state
+
+    connect(path, schema)   open a database in WAL mode and create its tables
+    ThreadConnections       one connection per thread (WAL lets readers run
+                            alongside the writer)
+    BatchWriter             background thread that gathers queued items for a
+                            short while and hands them to a write function in
+                            one batch, so callers never wait on disk
+
+Used by the disk cache, the observation store, the geocoding index and the
+shared rate limiter.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+
+def connect(path, schema=None, timeout=10, **kwargs):
+    """Open path (creating its directory) in WAL mode and run schema on it"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=timeout, **kwargs)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if schema:
+        conn.executescript(schema)
+    return conn
+
+
+class ThreadConnections:
+    """Lazily opened connection per thread to one database"""
+
+    def __init__(self, path, schema):
+        self.path = path
+        self.schema = schema
+        self._local = threading.local()
+
+    def get(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path, self.schema)
+        return conn
+
+
+class BatchWriter:
+    """Queue drained by a daemon thread that calls write(items) once per batch
+
+    A batch closes after flush_interval seconds or once the weights of its
+    items (1 each by default) reach batch_size. write() runs on the writer
+    thread; a batch it fails on is dropped and counted in errors, and the
+    thread carries on with the next one.
+    """
+
+    def __init__(self, write, name, batch_size, flush_interval, weight=None):
+        self.write = write
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.weight = weight or (lambda item: 1)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.errors = 0
+
+    def put(self, item):
+        """Queue item for the next batch (never blocks on disk)"""
+        self._queue.put(item)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def flush(self):
+        """Wait until everything queued so far has been written"""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            try:
+                self._gather(items)
+                self.write(items)
+            except Exception:
+                self.errors += 1  # Never let one bad batch stop the writer (flush() would hang)
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    def _gather(self, items):
+        """Add whatever else arrives within flush_interval to items, up to batch_size"""
+        size = self.weight(items[0])
+        deadline = time.monotonic() + self.flush_interval
+        # Gather whatever else arrives shortly so it lands in the same transaction
+        while size < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            items.append(item)
+            size += self.weight(item)
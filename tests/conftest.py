@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# The app modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Module-level stores are created at import time; keep them out of the repo's .weather_data
+os.environ["WEATHER_DATA_DIR"] = tempfile.mkdtemp(prefix="weather-tests-")
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import async_client
+from async_client import AsyncHTTPClient
+from http_client import CircuitBreaker, CircuitOpenError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mock_server import MockServer
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(async_client, 'backoff_delay', lambda attempt, response=None: 0)
+    for name in ("HTTP_PROXY", "http_proxy", "HTTPS_PROXY", "https_proxy", "ALL_PROXY", "all_proxy", "NO_PROXY", "no_proxy"):
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.fixture
+def mock_api():
+    server = MockServer(seed=0).start()
+    yield server
+    server.stop()
+
+
+def serve(handler):
+    """Start a throwaway HTTP server with handler; returns (server, base url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class JSONHandler(BaseHTTPRequestHandler):
+    """Answers every GET with the request line it received, as JSON"""
+
+    def do_GET(self):
+        payload = json.dumps({'path': self.path, 'host': self.headers.get('Host')}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def get(client, url, **kwargs):
+    async def request():
+        return await client.get(url, **kwargs)
+    return asyncio.run(request())
+
+
+def test_get_returns_json(mock_api):
+    response = get(AsyncHTTPClient(), f"{mock_api.url}/data/2.5/weather", params={'q': "Oslo"})
+    assert response.status_code == 200
+    assert response.json()['name'] == "Oslo"
+    response.raise_for_status()
+
+
+def test_error_status_raises_requests_http_error(mock_api):
+    response = get(AsyncHTTPClient(), f"{mock_api.url}/data/2.5/weather", params={'q': "Nowhere"})
+    assert response.status_code == 404
+    with pytest.raises(requests.HTTPError):
+        response.raise_for_status()
+
+
+def test_server_errors_are_retried(mock_api):
+    mock_api.error_rate = 1.0
+    client = AsyncHTTPClient(max_retries=2)
+    response = get(client, f"{mock_api.url}/data/2.5/weather", params={'q': "Oslo"})
+    assert response.status_code == 503
+    assert mock_api.requests == 3
+    host = mock_api.url.split("//")[1]
+    assert client.metrics()[host]['retries'] == 2
+
+
+def test_unreachable_host_raises_connection_error_and_opens_breaker(monkeypatch):
+    monkeypatch.setattr(async_client, 'CircuitBreaker', lambda: CircuitBreaker(threshold=1))
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    client = AsyncHTTPClient(max_retries=0)
+    with pytest.raises(requests.ConnectionError):
+        get(client, f"http://127.0.0.1:{port}/")
+    with pytest.raises(CircuitOpenError):
+        get(client, f"http://127.0.0.1:{port}/")
+    assert client.metrics()[f"127.0.0.1:{port}"]['circuit'] == 'open'
+
+
+def test_redirects_are_followed(mock_api):
+    target = f"{mock_api.url}/data/2.5/weather?q=Oslo"
+
+    class RedirectHandler(JSONHandler):
+        def do_GET(self):
+            self.send_response(302)
+            self.send_header("Location", target)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    server, url = serve(RedirectHandler)
+    try:
+        response = get(AsyncHTTPClient(), f"{url}/moved")
+    finally:
+        server.shutdown()
+    assert response.status_code == 200
+    assert response.url == target
+    assert response.json()['name'] == "Oslo"
+
+
+def test_http_proxy_from_environment_is_used(monkeypatch):
+    proxy, proxy_url = serve(JSONHandler)
+    monkeypatch.setenv("HTTP_PROXY", proxy_url)
+    try:
+        response = get(AsyncHTTPClient(), "http://api.example.invalid/data/2.5/weather", params={'q': "Oslo"})
+    finally:
+        proxy.shutdown()
+    # A forward proxy is sent the absolute URL, not just the path
+    assert response.json() == {'path': "http://api.example.invalid/data/2.5/weather?q=Oslo", 'host': "api.example.invalid"}
+
+
+def test_cancelled_half_open_trial_is_released(mock_api):
+    mock_api.latency = 1.0
+    client = AsyncHTTPClient()
+    host = mock_api.url.split("//")[1]
+    client._for_host(host)
+    breaker = client._breakers[host] = CircuitBreaker(threshold=1, cooldown=0)
+    breaker.record_failure()
+
+    async def cancel_mid_request():
+        task = asyncio.ensure_future(client.get(f"{mock_api.url}/data/2.5/weather", params={'q': "Oslo"}))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_mid_request())
+    assert breaker.allow()
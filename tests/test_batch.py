@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from batch import OUTPUT_FIELDS, ParquetSink, read_cities
+
+
+def city_rows(city, days=5):
+    return [dict.fromkeys(OUTPUT_FIELDS, None) | {'city': city, 'date': f"2024-01-0{day + 1}"} for day in range(days)]
+
+
+@pytest.fixture
+def parquet_sink(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(ParquetSink, 'FLUSH_ROWS', 10)
+    return ParquetSink(str(tmp_path / "out.parquet"))
+
+
+def test_parquet_cities_are_only_reported_once_flushed(parquet_sink):
+    assert parquet_sink.write(city_rows("Paris"), "Paris") == []
+    assert parquet_sink.write(city_rows("Oslo"), "Oslo") == ["Paris", "Oslo"]
+    assert parquet_sink.write(city_rows("Rome"), "Rome") == []
+    assert parquet_sink.close() == ["Rome"]
+
+
+def test_parquet_each_flush_is_a_complete_part_file(parquet_sink):
+    import pyarrow.parquet as pq
+    for city in ("Paris", "Oslo", "Rome"):
+        parquet_sink.write(city_rows(city), city)
+    # Without close(), the flushed part is already readable on its own
+    parts = sorted(name for name in os.listdir(parquet_sink.path) if name.endswith(".parquet"))
+    assert parts == ["part-00000.parquet"]
+    assert pq.read_table(os.path.join(parquet_sink.path, parts[0])).column('city').to_pylist()[::5] == ["Paris", "Oslo"]
+    parquet_sink.close()
+    assert pq.read_table(parquet_sink.path).num_rows == 15
+
+
+def test_parquet_resume_adds_new_parts(parquet_sink):
+    parquet_sink.write(city_rows("Paris"), "Paris")
+    parquet_sink.close()
+    resumed = ParquetSink(parquet_sink.path)
+    resumed.write(city_rows("Oslo"), "Oslo")
+    resumed.close()
+    assert sorted(os.listdir(parquet_sink.path)) == ["part-00000.parquet", "part-00001.parquet"]
+
+
+def test_parquet_accepts_float_percentages(parquet_sink):
+    import pyarrow.parquet as pq
+    rows = [row | {'current_humidity': 65.0, 'current_pressure': 1012.4, 'current_clouds': 20} for row in city_rows("Oslo")]
+    parquet_sink.write(rows, "Oslo")
+    assert parquet_sink.close() == ["Oslo"]
+    table = pq.read_table(parquet_sink.path)
+    assert set(table.column('current_humidity').to_pylist()) == {65}
+    assert set(table.column('current_pressure').to_pylist()) == {1012}
+
+
+def test_csv_blank_city_cells_are_skipped(tmp_path):
+    path = tmp_path / "cities.csv"
+    path.write_text("id,city,country\n17,,FR\n18,Paris,FR\n,  ,\n", encoding="utf-8")
+    assert list(read_cities(str(path))) == ["Paris"]
+
+
+def test_csv_without_city_header_uses_first_column(tmp_path):
+    path = tmp_path / "cities.csv"
+    path.write_text("name,country\nParis,FR\nOslo,NO\n", encoding="utf-8")
+    assert list(read_cities(str(path))) == ["Paris", "Oslo"]
+
+
+def test_jsonl_accepts_strings_and_skips_bad_lines(tmp_path, capsys):
+    path = tmp_path / "cities.jsonl"
+    path.write_text('{"city": "Paris"}\n"Oslo"\n["Rome"]\nnull\n{not json\n{"name": "Lima"}\n\n', encoding="utf-8")
+    assert list(read_cities(str(path))) == ["Paris", "Oslo"]
+    assert capsys.readouterr().err.count("line skipped") == 4
@@ -0,0 +1,99 @@
+import pytest
+
+from city_index import CityIndex, write_index
+
+CITIES = [
+    ('London', 'GB', 8980000),
+    ('London', 'CA', 400000),
+    ('Londrina', 'BR', 580000),
+    ('Lyon', 'FR', 520000),
+    ('Seville', 'ES', 690000),
+    ('Hamburg', 'DE', 1850000),
+    ('Berlin', 'DE', 3650000),
+    ('Bern', 'CH', 130000),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / 'cities.tsv'
+    write_index(CITIES, str(path))
+    return CityIndex(str(path), strict=False)
+
+
+@pytest.fixture
+def strict_index(index):
+    return CityIndex(index.path, strict=True)
+
+
+def test_seek_finds_first_line_at_or_after_key(index):
+    index._load()
+    data = index._data
+    offset = index._seek('london')
+    assert data[offset:].startswith(b'london\tLondon\tGB')
+    assert data[index._seek('londo'):].startswith(b'london\t')
+    assert data[index._seek('lyp'):].startswith(b'seville\t')
+    assert data[index._seek('zz'):] == b''  # past the last entry
+    assert index._seek('a') == 0
+
+
+def test_closest_returns_typo_candidates(index):
+    index._load()
+    assert index._closest('londn', 3)[0] == ('London', 'GB', 8980000)
+
+
+def test_closest_with_empty_block(index):
+    index._load()
+    assert index._closest('łodz', 3) == []
+    assert index._closest('123', 3) == []
+
+
+def test_check_known_names(index):
+    assert index.check('London') == (True, [])
+    assert index.check('London, CA') == (True, [])
+    assert index.check('London, US') == (True, [])  # country outside the bundled list
+
+
+def test_check_never_raises_for_names_without_a_block(index):
+    for query in ('Łódź', '123', 'Ørsted'):
+        assert index.check(query) == (True, [])
+
+
+def test_check_suggests_for_lookalikes(index):
+    ok, suggestions = index.check('Londn')
+    assert not ok
+    assert suggestions[0][:2] == ('London', 'GB')
+    ok, suggestions = index.check('Sevilla')
+    assert not ok and suggestions[0][0] == 'Seville'
+
+
+def test_check_lets_unrelated_unknown_names_through(index, strict_index):
+    assert index.check('Smalltown') == (True, [])
+    assert strict_index.check('Smalltown')[0] is False
+
+
+def test_check_with_missing_index(tmp_path):
+    assert CityIndex(str(tmp_path / 'missing.tsv')).check('Londn') == (True, [])
+
+
+def test_check_with_broken_index(tmp_path):
+    path = tmp_path / 'cities.tsv'
+    path.write_bytes(b'london\tLondon\n')  # missing columns
+    assert CityIndex(str(path)).check('Londn') == (True, [])
+
+
+def test_complete_offers_prefix_matches_by_population(index):
+    assert index.complete("lon") == [('London', 'GB', 8980000), ('Londrina', 'BR', 580000), ('London', 'CA', 400000)]
+    assert index.complete("Lon, CA") == [('London', 'CA', 400000)]
+    assert index.complete("Be", limit=1) == [('Berlin', 'DE', 3650000)]
+
+
+def test_complete_stops_once_a_city_is_named(index):
+    assert index.complete("London") == []
+    assert index.complete("London,GB") == []
+    assert index.complete("L") == []  # too short to narrow anything down
+    assert index.complete("Xyz") == []
+
+
+def test_complete_with_missing_index(tmp_path):
+    assert CityIndex(str(tmp_path / 'missing.tsv')).complete("Lon") == []
@@ -0,0 +1,34 @@
+import pytest
+import requests
+
+from http_client import CircuitBreaker, HTTPClient
+
+
+def half_open_breaker():
+    breaker = CircuitBreaker(threshold=1, cooldown=0)
+    breaker.record_failure()
+    assert breaker.state == 'half-open'
+    return breaker
+
+
+def test_half_open_trial_lets_exactly_one_request_through():
+    breaker = half_open_breaker()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+@pytest.mark.parametrize("error", [requests.TooManyRedirects, requests.exceptions.InvalidURL, KeyboardInterrupt])
+def test_unexpected_errors_release_the_half_open_trial(monkeypatch, error):
+    client = HTTPClient()
+    client._for_host('api.example.com')
+    breaker = client._breakers['api.example.com'] = half_open_breaker()
+
+    def fail(*args, **kwargs):
+        raise error("boom")
+
+    monkeypatch.setattr(client.session, 'get', fail)
+    with pytest.raises(error):
+        client.get("http://api.example.com/data")
+    assert breaker.allow()
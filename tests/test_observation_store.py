@@ -0,0 +1,10 @@
+from observation_store import ObservationStore
+
+
+def test_observation_store_round_trip(tmp_path):
+    store = ObservationStore(path=str(tmp_path / "obs.sqlite3"), enabled=True)
+    weather = {'id': 1, 'dt': 1000, 'main': {'temp': 3.5}, 'weather': [{'description': "snow", 'icon': "13d"}]}
+    store.record('weather', "Oslo", weather)
+    store.flush()
+    assert [row['temp'] for row in store.last_hours(1, now=1000)] == [3.5]
+    assert store.written == 1
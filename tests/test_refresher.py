@@ -0,0 +1,39 @@
+from refresher import BackgroundRefresher, HotCityTracker
+
+
+def test_spellings_of_one_city_share_a_score():
+    tracker = HotCityTracker()
+    for city in ("London", "london", "  LONDON ", "Paris"):
+        tracker.record(city, "k")
+    tracker.record("Paris", "k")
+    assert [city for city, _ in tracker.top(2)] == ["  LONDON ", "Paris"]
+    assert len(tracker.top(5)) == 2
+
+
+def test_pending_refreshes_are_deduplicated_by_cache_key():
+    refreshed = []
+    refresher = BackgroundRefresher(
+        lambda endpoint, city, api_key: refreshed.append((endpoint, city)),
+        lambda endpoint, city: None, ['weather']
+    )
+    refresher._ensure_started = lambda: None  # drive _refresh_due by hand
+    refresher.schedule('weather', "London", "k")
+    refresher.schedule('weather', "london", "k")
+    refresher._refresh_due()
+    assert refreshed == [('weather', "london")]
+
+
+def test_cities_nobody_asks_for_cool_off_the_hot_list(monkeypatch):
+    tracker = HotCityTracker(half_life=3600)
+    now = 1_000_000.0
+    monkeypatch.setattr("refresher.time.time", lambda: now)
+    tracker.record("Oslo", "k")
+    for _ in range(4):
+        tracker.record("Paris", "k")
+    assert [city for city, _ in tracker.top(5)] == ["Paris", "Oslo"]
+
+    now += 2 * 3600  # Oslo: 0.25, Paris: 1.0
+    assert tracker.top(5) == [("Paris", "k")]
+    now += 3 * 3600  # Paris: 0.125
+    assert tracker.top(5) == []
+    assert tracker._scores == {}
@@ -0,0 +1,60 @@
+import threading
+
+from disk_cache import DiskCache
+from sqlite_writer import BatchWriter, ThreadConnections
+
+
+def test_items_queued_together_are_written_in_one_batch():
+    batches = []
+    writer = BatchWriter(batches.append, "test-writer", batch_size=100, flush_interval=0.2)
+    for i in range(10):
+        writer.put(i)
+    writer.flush()
+    assert batches == [list(range(10))]
+
+
+def test_batches_close_at_batch_size_by_weight():
+    batches = []
+    writer = BatchWriter(batches.append, "test-writer", batch_size=4, flush_interval=0.2, weight=len)
+    for rows in (["a", "b"], ["c", "d"], ["e"]):
+        writer.put(rows)
+    writer.flush()
+    assert batches == [[["a", "b"], ["c", "d"]], [["e"]]]
+
+
+def test_each_thread_gets_its_own_connection(tmp_path):
+    connections = ThreadConnections(str(tmp_path / "sub" / "db.sqlite3"), "CREATE TABLE IF NOT EXISTS t (x)")
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(connections.get()))
+    thread.start()
+    thread.join()
+    assert connections.get() is connections.get()
+    assert seen[0] is not connections.get()
+    assert connections.get().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_disk_cache_round_trip(tmp_path):
+    cache = DiskCache(path=str(tmp_path / "cache.sqlite3"), enabled=True)
+    cache.put(("weather", "oslo"), b'{"temp": 3}', ttl=60)
+    cache.flush()
+    payload, _ = cache.get(("weather", "oslo"))
+    assert payload == b'{"temp": 3}'
+    assert cache.stats()['writes'] == 1
+
+
+
+def test_writer_survives_a_failing_batch():
+    batches = []
+
+    def write(items):
+        if "bad" in items:
+            raise ValueError("cannot encode")
+        batches.append(items)
+
+    writer = BatchWriter(write, "test-writer", batch_size=1, flush_interval=0.2)
+    writer.put("bad")
+    writer.flush()
+    writer.put("good")
+    writer.flush()
+    assert batches == [["good"]]
+    assert writer.errors == 1
@@ -0,0 +1,42 @@
+from async_client import AsyncHTTPClient
+from tracing import Tracer
+
+
+def test_flat_stats_are_exported_as_gauges():
+    tracer = Tracer()
+    tracer.register_stats("cache", lambda: {'hits': 3, 'enabled': True, 'codec': "gzip"})
+    text = tracer.prometheus_text()
+    assert "# TYPE weather_app_cache_hits gauge\nweather_app_cache_hits 3\n" in text
+    assert "weather_app_cache_enabled" not in text
+    assert "weather_app_cache_codec" not in text
+
+
+def test_labelled_stats_get_one_sample_per_label_value():
+    tracer = Tracer()
+    tracer.register_stats("http_client", lambda: {
+        'api.example.com': {'p95_ms': 12.5, 'requests': 4, 'circuit': "closed"},
+        'news.example.com': {'p95_ms': 80.0, 'requests': 1, 'circuit': "open"}
+    }, label="host")
+    lines = tracer.prometheus_text().splitlines()
+    assert lines.count("# TYPE weather_app_http_client_p95_ms gauge") == 1
+    assert 'weather_app_http_client_p95_ms{host="api.example.com"} 12.5' in lines
+    assert 'weather_app_http_client_requests{host="news.example.com"} 1' in lines
+    assert 'weather_app_http_client_circuit{host="news.example.com",state="open"} 1' in lines
+
+
+def test_http_client_metrics_are_exported_per_host():
+    client = AsyncHTTPClient()
+    client._for_host("api.example.com")[1].record(0.02, ok=True)
+    tracer = Tracer()
+    tracer.register_stats("async_http", client.metrics, label="host")
+    text = tracer.prometheus_text()
+    assert 'weather_app_async_http_requests{host="api.example.com"} 1' in text
+    assert 'weather_app_async_http_circuit{host="api.example.com",state="closed"} 1' in text
+
+
+def test_http_clients_are_registered_with_the_app_tracer():
+    import weather_api
+    # Only inspected: the shared tracer and clients are left as they are
+    sources = weather_api.tracer._stats_sources
+    assert sources['http_client'] == (weather_api.http_client.metrics, "host")
+    assert sources['async_http'] == (weather_api.async_http.metrics, "host")
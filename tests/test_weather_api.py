@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+import weather_api
+from disk_cache import DiskCache
+from forecast_store import ForecastStore
+from geocoding import GeocodeIndex
+from observation_store import ObservationStore
+from weather_cache import response_cache
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from mock_server import MockServer
+
+
+@pytest.fixture
+def mock_api(monkeypatch, tmp_path):
+    # Fresh caches and stores, so nothing is served from an earlier test or run
+    monkeypatch.setattr(weather_api, 'disk_cache', DiskCache(path=str(tmp_path / "cache.sqlite3"), enabled=True))
+    monkeypatch.setattr(weather_api, 'geocode_index', GeocodeIndex(path=str(tmp_path / "geocode.sqlite3")))
+    monkeypatch.setattr(weather_api, 'observation_store', ObservationStore(path=str(tmp_path / "obs.sqlite3")))
+    monkeypatch.setattr(weather_api, 'forecast_store', ForecastStore())
+    response_cache.clear()
+    server = MockServer(seed=0).start()
+    monkeypatch.setattr(weather_api, 'BASE_URL', f"{server.url}/data/2.5")
+    yield server
+    server.stop()
+
+
+@pytest.mark.parametrize("backend", ["async", "threads"])
+def test_fetch_cities_answers_every_spelling_once(mock_api, monkeypatch, backend):
+    monkeypatch.setattr(weather_api, 'FETCH_BACKEND', backend)
+    cities = [f"Spelling Test {backend}", f"spelling  test {backend.upper()}", "Nowhere"]
+    outcome = weather_api.fetch_cities(cities, "k")
+    assert list(outcome) == cities
+    assert outcome[cities[0]] is outcome[cities[1]]
+    results, errors = outcome[cities[0]]
+    assert set(results) == {'weather', 'forecast'} and not errors
+    assert set(outcome["Nowhere"][1]) == {'weather', 'forecast'}
+    assert mock_api.requests == 4
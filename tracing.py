@@ -0,0 +1,275 @@
+"""
+Lightweight stage timing for the Weather App
+
+Hot-path stages (upstream calls, DataFrame work, chart and map builds, the
+news fetch, whole reruns) are wrapped in tracer.span("stage"). Each span
+adds one sample to a per-stage histogram kept in memory; a span costs a
+couple of microseconds, so tracing stays on in production.
+
+The numbers are exposed as Prometheus text through any of:
+    METRICS_PORT=9100               -> http://host:9100/metrics
+    METRICS_DUMP_PATH=metrics.prom  -> rewritten every METRICS_DUMP_INTERVAL s
+    METRICS_ADMIN_VIEW=1            -> a timings panel in the app sidebar
+"""
+
+import bisect
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Tracing configuration (overridable through environment variables)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") != "0"
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # 0 disables the /metrics endpoint
+METRICS_DUMP_PATH = os.getenv("METRICS_DUMP_PATH", "")  # empty disables the file dump
+METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", "60"))  # seconds
+METRICS_ADMIN_VIEW = os.getenv("METRICS_ADMIN_VIEW", "0") == "1"
+METRIC_PREFIX = "weather_app"
+
+# Histogram bucket upper bounds in seconds (Prometheus 'le' labels)
+BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+RECENT_SAMPLES = 1024  # samples per stage kept for exact recent percentiles
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def percentile(sorted_samples, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return 0.0
+    index = max(0, math.ceil(q * len(sorted_samples)) - 1)
+    return sorted_samples[index]
+
+
+class StageHistogram:
+    """Cumulative bucket counts plus a window of recent samples for one stage"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+
+class Tracer:
+    """Process-wide stage timings with Prometheus text output"""
+
+    def __init__(self, enabled=TRACING_ENABLED):
+        self.enabled = enabled
+        self._stages = {}
+        self._stats_sources = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._exporters_started = False
+
+    def record(self, stage, seconds):
+        """Add one timing sample to a stage (and to the current rerun trace, if any)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = StageHistogram()
+            histogram.observe(seconds)
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace.append((stage, seconds))
+
+    def span(self, stage):
+        """Time the enclosed block as one sample of stage"""
+        return _Span(self, stage) if self.enabled else _NO_SPAN
+
+    def timed(self, stage):
+        """Decorator form of span()"""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def trace(self, stage):
+        """Time a whole rerun and collect the spans run on this thread inside it
+
+        Yields the list of (stage, seconds) pairs, which is complete once the
+        block exits. Spans on worker threads are aggregated but not listed.
+        """
+        previous = getattr(self._local, 'trace', None)
+        spans = []
+        self._local.trace = spans
+        try:
+            with self.span(stage):
+                yield spans
+        finally:
+            self._local.trace = previous
+            if previous is not None:
+                previous.extend(spans)
+
+    def register_stats(self, name, stats, label=None):
+        """Export the numeric values of a stats() callable as gauges
+
+        With a label, stats() returns {label value: {key: value}} (say, one
+        dict per upstream host) and every gauge carries that label. String
+        values (a breaker state) then become a gauge of 1 with a state label.
+        """
+        self._stats_sources[name] = (stats, label)
+
+    def snapshot(self):
+        """{stage: {'count', 'sum', 'p50', 'p95', 'p99'}} with times in seconds"""
+        with self._lock:
+            stages = {stage: (h.count, h.total, list(h.recent)) for stage, h in self._stages.items()}
+        summary = {}
+        for stage, (count, total, recent) in sorted(stages.items()):
+            recent.sort()
+            summary[stage] = {'count': count, 'sum': total}
+            for q in QUANTILES:
+                summary[stage][f"p{int(q * 100)}"] = percentile(recent, q)
+        return summary
+
+    def prometheus_text(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            stages = {stage: (list(h.counts), h.count, h.total) for stage, h in self._stages.items()}
+        name = f"{METRIC_PREFIX}_stage_seconds"
+        lines = [
+            f"# HELP {name} Time spent per stage.",
+            f"# TYPE {name} histogram"
+        ]
+        for stage, (counts, count, total) in sorted(stages.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+
+        recent_name = f"{METRIC_PREFIX}_stage_recent_seconds"
+        lines += [
+            f"# HELP {recent_name} Percentiles of the last {RECENT_SAMPLES} samples per stage.",
+            f"# TYPE {recent_name} gauge"
+        ]
+        for stage, summary in self.snapshot().items():
+            for q in QUANTILES:
+                lines.append(f'{recent_name}{{stage="{stage}",quantile="{q}"}} {summary[f"p{int(q * 100)}"]:.6f}')
+
+        for source, (stats, label) in sorted(self._stats_sources.items()):
+            try:
+                values = stats()
+            except Exception:
+                continue
+            gauges = {}
+            for label_value, row in sorted(values.items()) if label else [(None, values)]:
+                for key, value in sorted(row.items()):
+                    labels = {label: label_value} if label else {}
+                    if label and isinstance(value, str):
+                        labels['state'], value = value, 1
+                    elif not isinstance(value, (int, float)) or isinstance(value, bool):
+                        continue
+                    gauges.setdefault(f"{METRIC_PREFIX}_{source}_{key}", []).append((labels, value))
+            for metric, samples in gauges.items():
+                lines.append(f"# TYPE {metric} gauge")
+                lines += [f"{metric}{_labels(labels)} {value}" for labels, value in samples]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path=METRICS_DUMP_PATH):
+        """Atomically write the Prometheus text to path"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def start_exporters(self, port=METRICS_PORT, dump_path=METRICS_DUMP_PATH):
+        """Start the configured /metrics server and file dumper (once per process)"""
+        if self._exporters_started or not self.enabled:
+            return
+        with self._lock:
+            if self._exporters_started:
+                return
+            self._exporters_started = True
+        if port:
+            server = ThreadingHTTPServer(("0.0.0.0", port), _metrics_handler(self))
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        if dump_path:
+            threading.Thread(target=self._dump_loop, args=(dump_path,), name="metrics-dump", daemon=True).start()
+
+    def _dump_loop(self, path):
+        while True:
+            time.sleep(METRICS_DUMP_INTERVAL)
+            try:
+                self.dump(path)
+            except OSError:
+                pass  # Try again next interval
+
+
+class _Span:
+    """Context manager behind Tracer.span (a class is cheaper than @contextmanager)"""
+
+    __slots__ = ('tracer', 'stage', 'started')
+
+    def __init__(self, tracer, stage):
+        self.tracer = tracer
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.tracer.record(self.stage, time.perf_counter() - self.started)
+
+
+class _NoSpan:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def _labels(labels):
+    """Prometheus label set ({key="value",...}), empty when there are none"""
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"')
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _metrics_handler(tracer):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = tracer.prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes every few seconds would flood the app log
+
+    return MetricsHandler
+
+
+tracer = Tracer()
@@ -0,0 +1,366 @@
+"""
+OpenWeatherMap fetch layer for the Weather App
+
+Nothing in here touches Streamlit: functions raise requests.RequestException
+on failure and the caller decides how to show it. That keeps the fetchers
+safe to run on worker threads (which have no Streamlit script context).
+
+Responses are parsed into compact records (records.py) as soon as they
+arrive; the shared cache and every caller only ever see those records.
+The raw responses also go to the compressed disk tier (disk_cache.py),
+which refills the shared cache after a restart or from other workers.
+
+Upstream calls run on the asyncio backend (async_client.py) by default;
+FETCH_BACKEND=threads keeps them on a blocking thread pool instead.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+
+from async_client import async_http, event_loop, FETCH_BACKEND
+from disk_cache import disk_cache
+from forecast_store import forecast_store
+from geocoding import geocode_index, location_params
+from http_client import http_client
+from observation_store import observation_store
+from rate_limiter import owm_limiter, RateLimitExceeded, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from records import parse
+from refresher import BackgroundRefresher
+from tracing import tracer
+from weather_cache import (
+    response_cache, response_flight, async_response_flight, make_key, normalize_city,
+    WEATHER_CACHE_TTL, FORECAST_CACHE_TTL
+)
+
+BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "http://api.openweathermap.org/data/2.5")
+
+# Fetch stage configuration
+FETCH_DEADLINE = float(os.getenv("WEATHER_FETCH_DEADLINE", "12"))  # seconds for all per-city calls together
+FETCH_WORKERS = int(os.getenv("WEATHER_FETCH_WORKERS", "16"))
+RATE_LIMIT_WAIT = float(os.getenv("RATE_LIMIT_WAIT", "2"))  # seconds an interactive call may queue for budget
+
+# Cache lifetime per OpenWeatherMap endpoint
+ENDPOINT_TTLS = {
+    'weather': WEATHER_CACHE_TTL,
+    'forecast': FORECAST_CACHE_TTL
+}
+
+_executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="weather-fetch")
+
+
+def _fetch_cached(endpoint, city, api_key, ttl):
+    """Return the parsed record for an endpoint, using the shared cache when possible
+
+    Fresh entries are returned as-is. Expired entries still inside the stale
+    window are returned immediately while the background refresher fetches a
+    new copy. Concurrent misses for the same key share one upstream request.
+    """
+    cache_key = make_key(endpoint, city)
+    cached = _cache_hit(cache_key, endpoint, city, api_key)
+    if cached is not None:
+        return cached
+
+    try:
+        data = response_flight.do(cache_key, lambda: _fetch_upstream(endpoint, city, api_key, ttl))
+    except RateLimitExceeded:
+        # Out of API budget: an old answer beats an error page
+        data = response_cache.last_known(cache_key)
+        if data is None:
+            raise
+    refresher.record(city, api_key)
+    return data
+
+
+async def _fetch_cached_async(endpoint, city, api_key, ttl):
+    """_fetch_cached() for the event loop backend"""
+    cache_key = make_key(endpoint, city)
+    cached = await _cache_hit_async(cache_key, endpoint, city, api_key)
+    if cached is not None:
+        return cached
+
+    try:
+        data = await async_response_flight.do(
+            cache_key, lambda: _fetch_upstream_async(endpoint, city, api_key, ttl)
+        )
+    except RateLimitExceeded:
+        data = response_cache.last_known(cache_key)
+        if data is None:
+            raise
+    refresher.record(city, api_key)
+    return data
+
+
+def _cache_hit(cache_key, endpoint, city, api_key):
+    """Cached record for key (scheduling a refresh if it is stale), or None"""
+    cached, is_fresh = response_cache.lookup(cache_key)
+    if cached is None:
+        cached, is_fresh = _disk_hit(cache_key, endpoint)
+    return _note_hit(cached, is_fresh, endpoint, city, api_key)
+
+
+async def _cache_hit_async(cache_key, endpoint, city, api_key):
+    """_cache_hit() for the event loop backend; the disk tier is read on a worker thread"""
+    cached, is_fresh = response_cache.lookup(cache_key)
+    if cached is None:
+        cached, is_fresh = await asyncio.to_thread(_disk_hit, cache_key, endpoint)
+    return _note_hit(cached, is_fresh, endpoint, city, api_key)
+
+
+def _note_hit(cached, is_fresh, endpoint, city, api_key):
+    if cached is not None:
+        if not is_fresh:
+            refresher.schedule(endpoint, city, api_key)
+        refresher.record(city, api_key)
+    return cached
+
+
+def _disk_hit(cache_key, endpoint):
+    """(record, is_fresh) for key from the disk tier, loaded into the shared cache; (None, False) if absent"""
+    with tracer.span("disk_cache.load"):
+        entry = disk_cache.get(cache_key)
+        if entry is None:
+            return None, False
+        payload, expires_at = entry
+        try:
+            record = parse(endpoint, json.loads(payload), hashlib.sha1(payload).hexdigest())
+        except ValueError:
+            return None, False
+        if endpoint == 'forecast':
+            record, _ = forecast_store.merge(record)
+        ttl = expires_at - time.time()
+        response_cache.set(cache_key, record, ttl)
+    return record, ttl > 0
+
+
+def _request_params(city, api_key):
+    """(params, place) for an upstream call, by coordinates once the name is resolved
+
+    Querying by coordinates means the upstream never has to geocode the same
+    city twice.
+    """
+    place = geocode_index.lookup(city)
+    params = location_params(place) if place else {'q': city}
+    params.update({
+        'appid': api_key,
+        'units': 'metric'
+    })
+    return params, place
+
+
+def _store_response(endpoint, city, response, place, ttl):
+    """Parse an upstream response, record it and cache the record"""
+    if response.status_code == 429:
+        raise RateLimitExceeded("OpenWeatherMap rate limit reached, please try again shortly")
+    response.raise_for_status()
+    data = response.json()
+    try:
+        record = parse(endpoint, data, hashlib.sha1(response.content).hexdigest())
+    except ValueError as e:
+        raise requests.RequestException(str(e)) from None
+    if not place:
+        geocode_index.remember_response(city, data)
+    changed = True
+    if endpoint == 'forecast':
+        # Merge into the city's timeline; an unchanged forecast keeps its old
+        # record (and version), so nothing built from it is recomputed
+        record, changes = forecast_store.merge(record)
+        changed = bool(changes)
+    if changed:
+        observation_store.record(endpoint, city, data)  # Unchanged forecasts are not stored again
+    response_cache.set(make_key(endpoint, city), record, ttl)
+    disk_cache.put(make_key(endpoint, city), response.content, ttl)
+    return record
+
+
+def _fetch_upstream(endpoint, city, api_key, ttl, force=False, priority=PRIORITY_INTERACTIVE):
+    """Call OpenWeatherMap, parse the response and store the record in the shared cache"""
+    if not force:
+        cached = response_cache.get(make_key(endpoint, city))
+        if cached is not None:
+            return cached  # A call that finished just before we became leader
+
+    params, place = _request_params(city, api_key)
+    wait = RATE_LIMIT_WAIT if priority == PRIORITY_INTERACTIVE else 0
+    if not owm_limiter.acquire(priority, wait=wait):
+        raise RateLimitExceeded("OpenWeatherMap request budget exhausted, please try again shortly")
+
+    with tracer.span(f"upstream.{endpoint}"):
+        response = http_client.get(f"{BASE_URL}/{endpoint}", params=params)
+    return _store_response(endpoint, city, response, place, ttl)
+
+
+async def _fetch_upstream_async(endpoint, city, api_key, ttl, force=False, priority=PRIORITY_INTERACTIVE):
+    """_fetch_upstream() for the event loop backend
+
+    Everything that can block (the geocoding index, the SQLite rate limiter,
+    parsing and storing the response) runs on worker threads, so the loop
+    only ever awaits.
+    """
+    if not force:
+        cached = response_cache.get(make_key(endpoint, city))
+        if cached is not None:
+            return cached
+
+    params, place = await asyncio.to_thread(_request_params, city, api_key)
+    wait = RATE_LIMIT_WAIT if priority == PRIORITY_INTERACTIVE else 0
+    if not await owm_limiter.acquire_async(priority, wait=wait):
+        raise RateLimitExceeded("OpenWeatherMap request budget exhausted, please try again shortly")
+
+    with tracer.span(f"upstream.{endpoint}"):
+        response = await async_http.get(f"{BASE_URL}/{endpoint}", params=params)
+    return await asyncio.to_thread(_store_response, endpoint, city, response, place, ttl)
+
+
+def _fetch(endpoint, city, api_key):
+    """Fetch one endpoint for one city through the configured backend"""
+    ttl = ENDPOINT_TTLS[endpoint]
+    if FETCH_BACKEND == 'async':
+        return event_loop.run(_fetch_cached_async(endpoint, city, api_key, ttl))
+    return _fetch_cached(endpoint, city, api_key, ttl)
+
+
+def get_weather_data(city, api_key):
+    """Get current weather data for a city"""
+    return _fetch('weather', city, api_key)
+
+
+def get_forecast_data(city, api_key):
+    """Get 5-day forecast data for a city"""
+    return _fetch('forecast', city, api_key)
+
+
+def cached_city(city, api_key):
+    """The cached records for city without calling upstream: {endpoint: record or None}
+
+    Stale or missing entries are handed to the background refresher, so any
+    number of sessions polling a city cost at most one refresh per endpoint.
+    """
+    records = {}
+    for endpoint in CITY_FETCHERS:
+        cache_key = make_key(endpoint, city)
+        cached = _cache_hit(cache_key, endpoint, city, api_key)
+        if cached is None:
+            cached = response_cache.last_known(cache_key)
+            refresher.schedule(endpoint, city, api_key)
+        records[endpoint] = cached
+    return records
+
+
+def _refresh(endpoint, city, api_key):
+    """Force a new upstream fetch for one cached endpoint (refresher callback)"""
+    ttl = ENDPOINT_TTLS[endpoint]
+    key = make_key(endpoint, city)
+    if FETCH_BACKEND == 'async':
+        event_loop.run(async_response_flight.do(
+            key, lambda: _fetch_upstream_async(endpoint, city, api_key, ttl, force=True, priority=PRIORITY_BACKGROUND)
+        ))
+        return
+    response_flight.do(
+        key, lambda: _fetch_upstream(endpoint, city, api_key, ttl, force=True, priority=PRIORITY_BACKGROUND)
+    )
+
+
+def _expires_in(endpoint, city):
+    return response_cache.expires_in(make_key(endpoint, city))
+
+
+refresher = BackgroundRefresher(_refresh, _expires_in, list(ENDPOINT_TTLS))
+tracer.register_stats("response_cache", response_cache.stats)
+tracer.register_stats("disk_cache", disk_cache.stats)
+tracer.register_stats("response_flight", response_flight.stats)
+tracer.register_stats("async_response_flight", async_response_flight.stats)
+tracer.register_stats("event_loop", event_loop.stats)
+tracer.register_stats("forecast_store", forecast_store.stats)
+tracer.register_stats("refresher", refresher.stats)
+tracer.register_stats("owm_limiter", owm_limiter.stats)
+tracer.register_stats("http_client", http_client.metrics, label="host")
+tracer.register_stats("async_http", async_http.metrics, label="host")
+
+
+# Every call needed to render one city, keyed by OpenWeatherMap endpoint;
+# add new per-city endpoints here (and to ENDPOINT_TTLS)
+CITY_FETCHERS = {
+    'weather': get_weather_data,
+    'forecast': get_forecast_data
+}
+
+
+def fetch_city(city, api_key, deadline=FETCH_DEADLINE):
+    """Run all per-city fetchers concurrently and wait for them or the deadline
+
+    Returns (results, errors): results maps fetcher name to a record for the calls
+    that finished in time, errors maps fetcher name to a readable message for
+    the ones that failed or did not finish.
+    """
+    return fetch_cities([city], api_key, deadline)[city]
+
+
+@tracer.timed("fetch")
+def fetch_cities(cities, api_key, deadline=FETCH_DEADLINE):
+    """Fetch several cities at once, sharing one deadline
+
+    Names that normalize to the same cache key are fetched once. Every call
+    still goes through the shared cache and singleflight, so cities that are
+    already cached cost nothing upstream. Returns {city: (results, errors)}
+    with an entry for every input name, in input order, with the same shapes
+    as fetch_city(); spellings of one city share the same outcome.
+
+    With the async backend all calls run as tasks on the shared event loop
+    and this thread only waits for the outcome; with the threads backend
+    they run on the shared pool. Calls still running at the deadline keep
+    going in the background, so their results land in the cache.
+    """
+    unique = {}
+    for city in cities:
+        unique.setdefault(normalize_city(city), city)
+
+    if FETCH_BACKEND == 'async':
+        outcome = event_loop.run(_fetch_cities_async(list(unique.values()), api_key, deadline))
+    else:
+        futures = {}
+        for city in unique.values():
+            for name, fetcher in CITY_FETCHERS.items():
+                futures[_executor.submit(fetcher, city, api_key)] = (city, name)
+        done, not_done = wait(futures, timeout=deadline)
+        outcome = _collect(unique.values(), futures, done, not_done, deadline)
+    return {city: outcome[unique[normalize_city(city)]] for city in cities}
+
+
+async def _fetch_cities_async(cities, api_key, deadline):
+    tasks = {}
+    for city in cities:
+        for name in CITY_FETCHERS:
+            task = asyncio.ensure_future(_fetch_cached_async(name, city, api_key, ENDPOINT_TTLS[name]))
+            tasks[task] = (city, name)
+    done, not_done = await asyncio.wait(tasks, timeout=deadline)
+    for task in not_done:
+        task.add_done_callback(_discard_result)
+    return _collect(cities, tasks, done, not_done, deadline)
+
+
+def _discard_result(task):
+    """Retrieve a late task's outcome so asyncio does not log it as unhandled"""
+    if not task.cancelled():
+        task.exception()
+
+
+def _collect(cities, futures, done, not_done, deadline):
+    """Turn finished/unfinished futures into {city: (results, errors)}"""
+    outcome = {city: ({}, {}) for city in cities}
+    for future in done:
+        city, name = futures[future]
+        try:
+            outcome[city][0][name] = future.result()
+        except Exception as e:
+            outcome[city][1][name] = str(e)
+    for future in not_done:
+        city, name = futures[future]
+        outcome[city][1][name] = f"timed out after {deadline:.0f}s"
+
+    return outcome
@@ -0,0 +1,240 @@
+"""
+Process-wide response cache for the Weather App
+
+Streamlit re-executes app.py on every rerun, so anything defined there is
+rebuilt per session. Modules imported from app.py are only loaded once per
+process, which makes this the place for state shared by all sessions.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Cache configuration (overridable through environment variables)
+WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "600"))  # OpenWeatherMap refreshes roughly every 10 minutes
+FORECAST_CACHE_TTL = int(os.getenv("FORECAST_CACHE_TTL", "1800"))  # 3-hour forecast slots change slowly
+CACHE_STALE_TTL = int(os.getenv("WEATHER_CACHE_STALE_TTL", "600"))  # how long expired entries may still be served while refreshing
+CACHE_MAX_BYTES = int(os.getenv("WEATHER_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # 32 MB
+
+# Local directory for on-disk state (geocoding index and friends)
+DATA_DIR = os.getenv("WEATHER_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".weather_data"))
+
+
+def estimate_size(value):
+    """Approximate the memory footprint of a cached value in bytes"""
+    if hasattr(value, 'nbytes'):
+        return value.nbytes
+    try:
+        return len(json.dumps(value, separators=(',', ':')))
+    except (TypeError, ValueError):
+        return 1024
+
+
+def normalize_city(city):
+    """Collapse whitespace and case so "  new  York" and "New York" match"""
+    return ' '.join(city.split()).lower()
+
+
+def make_key(endpoint, city, units='metric'):
+    """Build a cache key from the endpoint, a normalized city name and units"""
+    return (endpoint, normalize_city(city), units)
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with per-entry TTL and a memory budget"""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, stale_ttl=CACHE_STALE_TTL, size_of=estimate_size):
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self.size_of = size_of
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def lookup(self, key):
+        """Return (value, is_fresh) for key
+
+        Expired entries are still returned (with is_fresh=False) for up to
+        stale_ttl seconds so callers can serve them while a refresh runs.
+        Returns (None, False) when there is nothing usable.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+
+            value, expires_at, size = entry
+            now = time.time()
+            if now >= expires_at + self.stale_ttl:
+                # Kept (until evicted) as a last resort, see last_known()
+                self.expirations += 1
+                self.misses += 1
+                return None, False
+
+            self._entries.move_to_end(key)
+            if now >= expires_at:
+                self.stale_hits += 1
+                return value, False
+            self.hits += 1
+            return value, True
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        value, is_fresh = self.lookup(key)
+        return value if is_fresh else None
+
+    def last_known(self, key):
+        """Return whatever value is held for key, however old, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[0]
+
+    def expires_in(self, key):
+        """Seconds until key expires (negative once stale), or None if absent"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[1] - time.time()
+
+    def set(self, key, value, ttl):
+        """Store value under key for ttl seconds, evicting old entries if needed"""
+        size = self.size_of(value)
+        if size > self.max_bytes:
+            return  # Never let a single payload flush the whole cache
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.time() + ttl, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes and self._entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all cached entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0
+            }
+
+    def _remove(self, key):
+        """Remove an entry and release its bytes (caller holds the lock)"""
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+class _Call:
+    """One in-flight upstream call that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """Run fn() for key, or wait for the identical call already in flight"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        """Return a snapshot of the coalescing counters"""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'executions': self.executions,
+                'coalesced': self.coalesced
+            }
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines; only used from the fetch event loop thread"""
+
+    def __init__(self):
+        self._calls = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key, factory):
+        """Await factory() for key, or the identical call already in flight"""
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = self._calls[key] = asyncio.ensure_future(factory())
+            self.executions += 1
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        # Shielded so one waiter giving up does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def stats(self):
+        """Return a snapshot of the coalescing counters"""
+        return {
+            'in_flight': len(self._calls),
+            'executions': self.executions,
+            'coalesced': self.coalesced
+        }
+
+
+response_cache = ResponseCache()
+response_flight = SingleFlight()
+async_response_flight = AsyncSingleFlight()